@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Offline-Benchmarks für die Hot-Paths des HDEncode-Watchers.
+
+Erzeugt synthetische Watchlists und RSS-Feeds mit realistischem
+Release-Namen-Rauschen und misst find_matches, is_title_match,
+normalize_title_for_matching, load_watchlist_from_csv, den unscharfen
+Abgleich und den RSS-Abruf (über einen lokalen HTTP-Server, ohne Internet).
+
+Beispiele:
+    python benchmark.py                      # Standardgrößen
+    python benchmark.py --full               # 1k-100k Titel, 100-10k Posts
+    python benchmark.py --save-baseline      # Ergebnisse als Baseline speichern
+    python benchmark.py --check              # Abbruch mit Exit-Code 1 bei Regression
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+import hdencode_crawler_linux as crawler
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(SCRIPT_DIR, "benchmark_baseline.json")
+
+WORDS = [
+    "dune", "alien", "night", "house", "dark", "river", "last", "blood",
+    "city", "love", "war", "star", "king", "queen", "ghost", "road", "sea",
+    "fire", "ice", "summer", "winter", "dream", "shadow", "moon", "sun",
+    "silent", "lost", "wild", "iron", "glass", "paper", "heart", "storm",
+    "beast", "god", "empire", "station", "garden", "mirror", "hunter",
+    "café", "señor", "über", "amélie",
+]
+PREFIXES = ["The", "A", "", "", "", "Der", "La"]
+RESOLUTIONS = ["720p", "1080p", "2160p"]
+SOURCES = ["BluRay", "WEB-DL", "WEBRip", "REMUX", "UHD.BluRay", "HDTV"]
+CODECS = ["x264", "x265", "H.264", "HEVC", "AVC"]
+EXTRAS = ["", "", "HDR", "DV", "HDR10Plus", "DTS-HD.MA.5.1", "DDP5.1", "Atmos"]
+GROUPS = ["FraMeSToR", "SPARKS", "NTb", "FLUX", "EPSiLON", "W4NK3R", "DON"]
+
+
+def make_title(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+    prefix = rng.choice(PREFIXES)
+    title = " ".join(w.capitalize() for w in words)
+    if rng.random() < 0.1:
+        title += ": " + rng.choice(WORDS).capitalize()
+    return f"{prefix} {title}".strip()
+
+
+def make_watchlist(size, seed=1):
+    rng = random.Random(seed)
+    return [
+        (make_title(rng).lower(), str(rng.randint(1950, 2025)))
+        for _ in range(size)
+    ]
+
+
+def make_release_name(rng, title, year):
+    """Release-Name im Stil von HDEncode, z. B. Dune.Part.Two.2024.2160p.UHD.BluRay.x265-GRP."""
+    name = title.replace(": ", ".").replace(" ", rng.choice([".", " "]))
+    parts = [name, year, rng.choice(RESOLUTIONS), rng.choice(SOURCES)]
+    extra = rng.choice(EXTRAS)
+    if extra:
+        parts.append(extra)
+    parts.append(rng.choice(CODECS))
+    return ".".join(parts) + "-" + rng.choice(GROUPS)
+
+
+def make_posts(count, watchlist, hit_rate=0.05, seed=2):
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        if watchlist and rng.random() < hit_rate:
+            title, year = rng.choice(watchlist)
+            title = title.title()
+        else:
+            title, year = make_title(rng), str(rng.randint(1950, 2025))
+        posts.append((make_release_name(rng, title, year), f"https://hdencode.org/post-{i}/"))
+    return posts
+
+
+def make_rss(posts):
+    """RSS-Feed aus (Titel, Link) oder (Titel, Link, Unix-Zeit), neueste zuerst."""
+    now = time.time()
+    items = []
+    for i, post in enumerate(posts):
+        title, link = post[:2]
+        published = post[2] if len(post) > 2 else now - i * 600
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>{escape(link)}</link>"
+            f"<guid>{escape(link)}</guid>"
+            f"<pubDate>{formatdate(published)}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel><title>HDEncode</title>'
+        + "".join(items)
+        + "</channel></rss>"
+    )
+
+
+def write_watchlist_csv(watchlist, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Date,Name,Year,Letterboxd URI\n")
+        for title, year in watchlist:
+            title = title.replace('"', '""')
+            f.write(f'2024-01-01,"{title}",{year},\n')
+
+
+class FeedServer:
+    """Lokaler HTTP-Server, der einen festen Feed ausliefert."""
+
+    def __init__(self, body):
+        payload = body.encode("utf-8")
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/feed/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def measure(name, func, items, repeat):
+    """Führt func() `repeat`-mal aus und misst Laufzeiten sowie Spitzenspeicher."""
+    func()  # Aufwärmen
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    median = statistics.median(durations)
+    return {
+        "name": name,
+        "items": items,
+        "throughput": items / median if median else float("inf"),
+        "p50_ms": median * 1000,
+        "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+        "max_ms": durations[-1] * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run_benchmarks(watchlist_sizes, post_counts, repeat, seed):
+    results = []
+    largest_watchlist = make_watchlist(max(watchlist_sizes), seed)
+
+    sample_titles = [title for title, _ in make_posts(10000, largest_watchlist, seed=seed + 1)]
+    results.append(measure(
+        "normalize_title_for_matching",
+        lambda: [crawler.normalize_title_for_matching(t) for t in sample_titles],
+        len(sample_titles), repeat,
+    ))
+
+    pairs = list(zip(largest_watchlist[:2000], sample_titles[:2000]))
+    results.append(measure(
+        "is_title_match",
+        lambda: [crawler.is_title_match(name, year, t.lower()) for (name, year), t in pairs],
+        len(pairs), repeat,
+    ))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in watchlist_sizes:
+            path = os.path.join(tmp, f"watchlist_{size}.csv")
+            write_watchlist_csv(largest_watchlist[:size], path)
+            results.append(measure(
+                f"load_watchlist_from_csv[{size}]",
+                lambda: crawler.load_watchlist_from_csv(path),
+                size, repeat,
+            ))
+
+        # RSS-Abruf schreibt in den Katalog: temporären Katalog verwenden
+        crawler.catalog = crawler.CatalogStore(os.path.join(tmp, "catalog.db"))
+        for count in post_counts:
+            body = make_rss(make_posts(count, largest_watchlist, seed=seed + 2))
+            with FeedServer(body) as server:
+                results.append(measure(
+                    f"get_rss_posts[{count}]",
+                    lambda: crawler.fetch_rss_posts(server.url),
+                    count, repeat,
+                ))
+
+    for size in watchlist_sizes:
+        watchlist = largest_watchlist[:size]
+        index = crawler.WatchlistIndex(watchlist)
+        fuzzy_index = crawler.WatchlistIndex(watchlist, fuzzy=True)
+        results.append(measure(
+            f"WatchlistIndex[{size}]",
+            lambda: crawler.WatchlistIndex(watchlist),
+            size, repeat,
+        ))
+        results.append(measure(
+            f"WatchlistIndex_fuzzy[{size}]",
+            lambda: crawler.WatchlistIndex(watchlist, fuzzy=True),
+            size, repeat,
+        ))
+        for count in post_counts:
+            posts = make_posts(count, watchlist, seed=seed + 3)
+            results.append(measure(
+                f"find_matches[{size}x{count}]",
+                lambda: crawler.find_matches(index, posts, set()),
+                count, repeat,
+            ))
+            results.append(measure(
+                f"find_matches_fuzzy[{size}x{count}]",
+                lambda: crawler.find_matches(fuzzy_index, posts, set()),
+                count, repeat,
+            ))
+
+    return results
+
+
+def print_results(results, baseline=None):
+    print(f"{'Benchmark':<38} {'Ops/s':>12} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'max ms':>9} {'Peak KB':>10} {'Δ Baseline':>11}")
+    for r in results:
+        delta = ""
+        if baseline and r["name"] in baseline:
+            base = baseline[r["name"]]["throughput"]
+            delta = f"{(r['throughput'] / base - 1) * 100:+.1f}%"
+        print(f"{r['name']:<38} {r['throughput']:>12.0f} {r['p50_ms']:>9.2f} "
+              f"{r['p95_ms']:>9.2f} {r['max_ms']:>9.2f} {r['peak_kb']:>10.0f} {delta:>11}")
+
+
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base and r["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{r['name']}: {r['throughput']:.0f} Ops/s "
+                f"(Baseline {base['throughput']:.0f} Ops/s)"
+            )
+    return regressions
+
+
+def parse_sizes(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Benchmarks für den HDEncode-Watcher")
+    parser.add_argument("--watchlist", type=parse_sizes, default=[1000, 10000],
+                        help="Watchlist-Größen, kommagetrennt (Standard: 1000,10000)")
+    parser.add_argument("--posts", type=parse_sizes, default=[100, 1000],
+                        help="Feed-Größen, kommagetrennt (Standard: 100,1000)")
+    parser.add_argument("--full", action="store_true",
+                        help="Volle Matrix: 1k/10k/100k Titel × 100/1k/10k Posts")
+    parser.add_argument("--repeat", type=int, default=5, help="Messläufe pro Benchmark")
+    parser.add_argument("--seed", type=int, default=1, help="Seed für die Testdaten")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Pfad der Baseline-Datei")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit-Code 1, wenn der Durchsatz die Baseline unterschreitet")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Erlaubter Durchsatzverlust für --check (Standard: 0.25)")
+    args = parser.parse_args()
+
+    if args.full:
+        args.watchlist = [1000, 10000, 100000]
+        args.posts = [100, 1000, 10000]
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(args.watchlist, args.posts, args.repeat, args.seed)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({r["name"]: r for r in results}, f, indent=2)
+        print(f"✓ Baseline gespeichert: {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print("⚠️ Keine Baseline vorhanden – zuerst mit --save-baseline erzeugen.")
+            return 1
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print("❌ Regressionen gefunden:")
+            for line in regressions:
+                print(f"  → {line}")
+            return 1
+        print("✓ Keine Regressionen.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,50 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import os
 import time
+import argparse
+import asyncio
 import threading
+import functools
+import cProfile
+import pstats
+import tracemalloc
 import requests
-import feedparser
 import logging
 import csv
 import signal
-import sys
 import re
-import gspread
+import json
+import calendar
+import sqlite3
+import hashlib
+import marshal
+import math
+import html
+import random
+import unicodedata
 import warnings
 
-from bs4 import BeautifulSoup
-from datetime import datetime
-from telegram.ext import Updater, CommandHandler, CallbackContext
-from telegram import Update
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html.parser import HTMLParser
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
 from io import StringIO
-from oauth2client.service_account import ServiceAccountCredentials
+from typing import TYPE_CHECKING
+from urllib3.util import make_headers
+
+# telegram.ext, gspread/oauth2client, bs4, feedparser, lxml und unidecode
+# brauchen zusammen mehr Importzeit als der erste Feed-Abruf; sie werden
+# erst in den Funktionen importiert, die sie verwenden.
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import CallbackContext
 
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -26,12 +53,91 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 TELEGRAM_TOKEN = ""
 TELEGRAM_CHAT_ID = ""
 
-CHECK_INTERVAL = 3600
+CHECK_INTERVAL = 3600     # Start-Intervall, danach adaptiv (PollScheduler)
+POLL_MIN_INTERVAL = 300   # Kürzestes Abfrage-Intervall (s)
+POLL_MAX_INTERVAL = 3600  # Längstes Abfrage-Intervall (s)
+POLL_TARGET_POSTS = 3     # Angestrebte neue Einträge pro Abfrage
+POLL_RATE_WINDOW = 6 * 3600  # Zeitfenster für die Ratenschätzung (s)
+FEED_URL_TTL = 6 * 3600  # Gültigkeit der ermittelten Feed-URL (s)
+FEED_CACHE_TTL = 300     # Gültigkeit des zuletzt geladenen Feeds (s)
+FEED_CHUNK_SIZE = 16384  # Blockgröße beim Streamen des Feeds (Bytes)
+FEED_STREAM_BUFFER_LIMIT = 4 * 1024 * 1024  # Puffer für den feedparser-Fallback (Bytes)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-SEEN_LINKS_FILE = os.path.join(SCRIPT_DIR, "seen_links.txt")
+SEEN_LINKS_FILE = os.path.join(SCRIPT_DIR, "seen_links.txt")  # Altformat, wird migriert
+SEEN_DB_FILE = os.path.join(SCRIPT_DIR, "seen_links.db")
+PENDING_MESSAGES_FILE = os.path.join(SCRIPT_DIR, "pending_messages.json")
+SEEN_MAX_AGE_DAYS = 365            # Ältere Einträge werden entfernt
+SEEN_FLUSH_BATCH = 50              # Gebündelte Schreibzugriffe
+SEEN_FLUSH_INTERVAL = 60           # Spätestens nach so vielen Sekunden schreiben
+SEEN_MAINTENANCE_INTERVAL = 86400  # Aufräumen/Verdichten einmal täglich
+SEEN_USE_BLOOM = True              # Bloom-Filter für schnelle Negativ-Abfragen
+FEED_STATE_FILE = os.path.join(SCRIPT_DIR, "feed_state.json")
 WATCHLIST_CSV = os.path.join(SCRIPT_DIR, "watchlist.csv")
+WATCHLIST_CACHE_FILE = os.path.join(SCRIPT_DIR, "watchlist_cache.bin")  # Snapshot für Warmstarts (marshal, vornormalisiert)
+WATCHLIST_REFRESH_INTERVAL = 300  # Prüfabstand für Änderungen an der Watchlist (s)
+GOOGLE_SHEET_ID = ""
+SUBSCRIBERS_FILE = os.path.join(SCRIPT_DIR, "subscribers.json")  # Optional: mehrere Abonnenten
 LOG_FILE = os.path.join(SCRIPT_DIR, "watcher.log")
 
+# Basis-URLs (per Umgebungsvariable überschreibbar, z. B. für replay.py)
+HDENCODE_BASE_URL = os.environ.get("HDENCODE_BASE_URL", "https://www.hdencode.org")
+FALLBACK_FEED_URL = os.environ.get(
+    "HDENCODE_FALLBACK_FEED_URL", "https://hdencode.org/feed/?sfw=pass1751722421"
+)
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+CRAWL_CONCURRENCY = 5      # Gleichzeitige Seitenabrufe pro Crawl
+CRAWL_HOST_LIMIT = 3       # Maximal parallele Anfragen pro Host
+CRAWL_HOST_DELAY = 0.2     # Mindestabstand zwischen Anfragen an einen Host (s)
+CRAWL_TIMEOUT = 30         # Timeout pro Seite (s)
+CRAWL_DEADLINE = 60        # Gesamtlimit für einen Crawl (s)
+PAGE_CACHE_TTL = 600       # Gültigkeit geladener Seiten für /suchealle (s)
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+HTTP_TIMEOUT = 15          # Standard-Timeout pro Anfrage (s)
+HTTP_RETRIES = 3           # Wiederholungen bei Verbindungsfehlern, 429 und 5xx (nur GET)
+HTTP_BACKOFF_BASE = 1.0    # Erste Wartezeit vor einer Wiederholung, verdoppelt sich je Versuch (s)
+HTTP_BACKOFF_MAX = 10      # Obergrenze pro Wartezeit, auch für Retry-After (s)
+BREAKER_FAILURE_THRESHOLD = 5  # Fehlgeschlagene Anfragen in Folge, bis der Circuit Breaker öffnet
+BREAKER_RESET_TIMEOUT = 300    # So lange bleibt er offen, danach ein einzelner Testabruf (s)
+SEARCH_EDIT_INTERVAL = 2   # Mindestabstand zwischen Fortschritts-Updates der Suche (s)
+CATCHUP_MAX_PAGES = 50     # Höchstens so viele Seiten beim Nachholen nach Ausfällen
+CATCHUP_DEADLINE = 120     # Zeitbudget für das Nachholen (s)
+HTML_EXTRACTOR = "auto"    # "lxml", "bs4" oder "auto" (lxml, falls installiert)
+FUZZY_MATCHING = False     # Unscharfer Abgleich (Trigramme), wenn kein exakter Treffer
+FUZZY_THRESHOLD = 0.85     # Mindest-Ähnlichkeit (Dice-Koeffizient) für unscharfe Treffer
+
+CATALOG_DB = os.path.join(SCRIPT_DIR, "catalog.db")
+BACKFILL_INTERVAL = 900     # Abstand zwischen Backfill-Läufen (s)
+BACKFILL_PAGES_PER_RUN = 5  # Ältere Seiten pro Backfill-Lauf
+BACKFILL_MAX_PAGE = 500     # Tiefste Seite, bis zu der der Katalog aufgefüllt wird
+CATALOG_RETRY_INTERVAL = 600  # Nach einem Fehler beim Öffnen erst so spät erneut versuchen (s)
+
+BLOCKING_WORKERS = 8  # Threads für blockierende I/O der asyncio-Laufzeit
+BOT_WORKERS = 8       # Parallel bearbeitete Telegram-Kommandos
+
+TELEGRAM_MAX_LENGTH = 4096   # Maximale Länge einer Telegram-Nachricht
+TELEGRAM_RATE_PER_SEC = 1.0  # Nachrichten pro Sekunde und Chat
+TELEGRAM_RATE_BURST = 3      # Kurzzeitig erlaubte Nachrichten am Stück
+NOTIFY_COALESCE_DELAY = 2    # Wartezeit zum Bündeln von Bursts (s)
+NOTIFY_MAX_ATTEMPTS = 10     # Danach wird eine Nachricht verworfen
+NOTIFY_DRAIN_TIMEOUT = 10    # Zustellversuch beim Beenden (s)
+# Releases eines Films so lange sammeln (s), auch über mehrere Abrufe hinweg.
+# 600 deckt zwei Abrufe im kürzesten Intervall ab (POLL_MIN_INTERVAL);
+# 0 = sofort senden, nur Releases desselben Abrufs werden zusammengefasst
+NOTIFY_GROUP_WINDOW = os.environ.get("HDENCODE_NOTIFY_GROUP_WINDOW") or 600
+
+QUALITY_MIN_RESOLUTION = ""    # z. B. "1080p"; leer = keine Untergrenze
+QUALITY_EXCLUDED_SOURCES = []  # z. B. ["HDTV", "WEBRip"]
+QUALITY_EXCLUDED_GROUPS = []   # Release-Gruppen, die ignoriert werden
+QUALITY_MAX_SIZE_GB = 0        # 0 = keine Obergrenze
+
+METRICS_HOST = "127.0.0.1"  # Metrics-Endpunkt nur lokal erreichbar
+METRICS_PORT = 9108         # 0 deaktiviert den Endpunkt
+
+PROFILE_DIR = os.path.join(SCRIPT_DIR, "profiles")
+PROFILE_SAMPLE_RATE = os.environ.get("HDENCODE_PROFILE") or 0  # Anteil profilierter Zyklen/Kommandos (0–1)
+PROFILE_KEEP = 20    # Aufbewahrte Profile (ältere werden gelöscht)
+PROFILE_TOP_N = 25   # Zeilen je Zusammenfassung
+
 # === LOGGING ===
 logging.basicConfig(
     level=logging.ERROR,  # Temporär auf DEBUG für bessere Diagnose
@@ -42,10 +148,20 @@ logging.basicConfig(
 
 # === GLOBALS ===
 last_check_time = None
-seen_links_lock = threading.Lock()
+http_session = None
+http_session_lock = threading.Lock()
+catalog = None
+catalog_lock = threading.Lock()
+catalog_failed_at = None  # Zeitpunkt (monotonic) des letzten gescheiterten Öffnens
+seen_links_lock = threading.RLock()
+seen_store = None
 watchlist_lock = threading.Lock()
+subscribers = None
+active_searches = {}  # chat_id -> Abbruch-Event der laufenden /suchealle
+active_searches_lock = threading.Lock()
 running = threading.Event()
 running.set()
+startup_time = time.monotonic()  # Bezugspunkt für die Zeit bis zum ersten Feed-Abruf
 
 
 def normalize(text):
@@ -116,20 +232,59 @@ def is_problematic_substring_match(film_name_raw, feed_title_raw):
     return False
 
 
+def normalize_match_text(text):
+    """Normalisierung für das Wortgruppen-Matching (Punkte als Worttrenner)."""
+    text = text.lower()
+    text = text.replace(".", " ")
+    text = re.sub(r"[^\w\s]", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+ROMAN_NUMERALS = {
+    "i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6", "vii": "7",
+    "viii": "8", "ix": "9", "x": "10", "xi": "11", "xii": "12", "xiii": "13",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_unidecode():
+    """Importiert unidecode beim ersten Gebrauch (optional, bessere Transliteration); sonst None."""
+    try:
+        from unidecode import unidecode
+    except ImportError:
+        return None
+    return unidecode
+
+
+def fold_match_text(text):
+    """
+    Tolerante Normalisierung für den unscharfen Abgleich: Umschrift nach
+    ASCII, "&" als "and", römische Zahlen als Ziffern, Satzzeichen entfernt.
+    """
+    unidecode = load_unidecode()
+    if unidecode is not None:
+        text = unidecode(text)
+    else:
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    text = text.lower().replace("&", " and ").replace(".", " ")
+    text = re.sub(r"[^a-z0-9\s]", "", text)
+    return " ".join(ROMAN_NUMERALS.get(word, word) for word in text.split())
+
+
+def trigrams(text):
+    """Zeichen-Trigramme eines normalisierten Textes (mit Randmarkierung)."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
 def is_title_match(film_name, film_year, feed_title):
     """Exaktes Wortgruppen-Matching nur bei eigenständiger Position."""
     logging.debug(
         f"Prüfe Match: '{film_name}' ({film_year}) gegen '{feed_title}'"
     )
 
-    def normalize(text):
-        text = text.lower()
-        text = text.replace(".", " ")
-        text = re.sub(r"[^\w\s]", "", text)
-        return re.sub(r"\s+", " ", text).strip()
-
-    film_phrase = normalize(film_name)
-    feed_text = normalize(feed_title)
+    film_phrase = normalize_match_text(film_name)
+    feed_text = normalize_match_text(feed_title)
 
     words = film_phrase.split()
     pattern = (
@@ -147,6 +302,251 @@ def is_title_match(film_name, film_year, feed_title):
     return False
 
 
+class WatchlistIndex:
+    """
+    Vorberechneter Matching-Index über die Watchlist.
+
+    Die Titel werden einmal normalisiert und über ihre vollständige
+    Wortgruppe indiziert. Ein Feed-Titel kostet je gültiger Startposition und
+    vorkommender Wortgruppen-Länge einen Dictionary-Zugriff, unabhängig davon,
+    wie viele Titel mit "the", "der" oder "la" beginnen. Die Ergebnisse entsprechen exakt
+    is_title_match() inklusive Jahr-Prüfung und (19|20)xx-Präfixregel.
+
+    Mit fuzzy=True gibt es eine zweite, unscharfe Stufe für Feed-Titel ohne
+    exakten Treffer: Trigramm-Index pro Jahr über fold_match_text(), der
+    Titelteil vor dem Jahr wird per Dice-Koeffizient gegen alle Kandidaten
+    des Jahres bewertet (Schwelle FUZZY_THRESHOLD).
+    """
+
+    YEAR_TOKEN = re.compile(r'(?:19|20)\d{2}')
+    FEED_YEARS = re.compile(r'\b(?:19|20)\d{2}\b')
+
+    def __init__(self, watchlist, exclude_problematic=False, fuzzy=False,
+                 fuzzy_threshold=FUZZY_THRESHOLD):
+        self.exclude_problematic = exclude_problematic
+        self.fuzzy = fuzzy
+        self.fuzzy_threshold = fuzzy_threshold
+        self._build(watchlist)
+
+    def _build(self, watchlist, words=None):
+        self.entries = []
+        self._by_phrase = {}       # Wortgruppe -> Positionen
+        self._phrase_lengths = {}  # Wortgruppen-Länge -> Anzahl Einträge
+        self._empty_phrases = []
+        self._positions = {}
+        self._size = 0
+        self._trigrams_by_year = {}  # Jahr -> Trigramm -> Positionen
+        self._trigram_sets = {}      # Position -> Trigramme des Titels
+
+        words = words or {}
+        for film_name, film_year in watchlist:
+            self._add(film_name, film_year, words.get((film_name, film_year)))
+
+    def _add(self, film_name, film_year, words=None):
+        position = len(self.entries)
+        if words is None:
+            words = tuple(normalize_match_text(film_name).split())
+        self.entries.append((film_name, film_year, words))
+        self._positions.setdefault((film_name, film_year), []).append(position)
+        self._size += 1
+
+        if words:
+            self._by_phrase.setdefault(words, []).append(position)
+            self._phrase_lengths[len(words)] = self._phrase_lengths.get(len(words), 0) + 1
+        else:
+            # Leere Wortgruppe passt (wie im Regex) auf jeden nicht-leeren Titel
+            self._empty_phrases.append(position)
+
+        if self.fuzzy and film_year:
+            grams = trigrams(fold_match_text(film_name))
+            self._trigram_sets[position] = grams
+            postings = self._trigrams_by_year.setdefault(film_year, {})
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+
+    def _remove(self, position):
+        film_name, film_year, words = self.entries[position]
+        self.entries[position] = None  # Lücke, wird beim Verdichten entfernt
+        self._size -= 1
+
+        positions = self._positions[(film_name, film_year)]
+        positions.remove(position)
+        if not positions:
+            del self._positions[(film_name, film_year)]
+
+        if words:
+            bucket = self._by_phrase[words]
+            bucket.remove(position)
+            if not bucket:
+                del self._by_phrase[words]
+            self._phrase_lengths[len(words)] -= 1
+            if not self._phrase_lengths[len(words)]:
+                del self._phrase_lengths[len(words)]
+        else:
+            self._empty_phrases.remove(position)
+
+        grams = self._trigram_sets.pop(position, None)
+        if grams:
+            postings = self._trigrams_by_year[film_year]
+            for gram in grams:
+                postings[gram].remove(position)
+                if not postings[gram]:
+                    del postings[gram]
+            if not postings:
+                del self._trigrams_by_year[film_year]
+
+    def update(self, watchlist, words=None):
+        """
+        Gleicht den Index inkrementell mit einer neuen Watchlist ab: nur
+        hinzugekommene Titel werden normalisiert, entfernte ausgetragen.
+        words kann bereits normalisierte Wortgruppen je (Name, Jahr)
+        liefern (siehe normalized()). Liefert (Anzahl neu, Anzahl entfernt).
+
+        Die Reihenfolge der Einträge entspricht danach immer der Watchlist,
+        der erste Treffer in match() ist also derselbe wie bei einem frisch
+        aufgebauten Index.
+        """
+        watchlist = list(watchlist)
+        words = words or {}
+        wanted = {}
+        for film_name, film_year in watchlist:
+            key = (film_name, film_year)
+            wanted[key] = wanted.get(key, 0) + 1
+
+        removed = 0
+        for key, positions in list(self._positions.items()):
+            for position in positions[wanted.get(key, 0):]:
+                self._remove(position)
+                removed += 1
+
+        added = 0
+        for key, count in wanted.items():
+            for _ in range(count - len(self._positions.get(key, ()))):
+                self._add(*key, words.get(key))
+                added += 1
+
+        # Neue Titel stehen hinten; weicht die Reihenfolge dadurch (oder durch
+        # Umsortieren) von der Watchlist ab oder gibt es viele Lücken, Index
+        # in Watchlist-Reihenfolge neu aufbauen. Die Normalisierung wird
+        # dabei wiederverwendet.
+        if list(self) != watchlist or len(self.entries) > 2 * self._size + 64:
+            self._build(watchlist, {**words, **self.normalized()})
+
+        return added, removed
+
+    def normalized(self):
+        """Normalisierte Wortgruppen aller Einträge als {(Name, Jahr): Wörter}."""
+        return {
+            (entry[0], entry[1]): entry[2]
+            for entry in self.entries if entry is not None
+        }
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for entry in self.entries:
+            if entry is not None:
+                yield entry[0], entry[1]
+
+    def _phrase_hits(self, tokens):
+        """Positionen aller Einträge, deren Wortgruppe an gültiger Stelle steht."""
+        if not tokens:
+            return []
+
+        hits = list(self._empty_phrases)
+        starts = [0] + [
+            i for i in range(1, len(tokens))
+            if self.YEAR_TOKEN.fullmatch(tokens[i - 1])
+        ]
+
+        for start in starts:
+            for length in self._phrase_lengths:
+                if start + length <= len(tokens):
+                    hits.extend(self._by_phrase.get(tuple(tokens[start:start + length]), ()))
+
+        return hits
+
+    def match(self, feed_title, skip_keys=()):
+        """
+        Liefert den ersten Watchlist-Eintrag (film_name, film_year), der auf
+        den Feed-Titel passt, oder None. Einträge, deren Schlüssel in
+        skip_keys enthalten ist, werden übersprungen.
+        """
+        years_in_feed = set(self.FEED_YEARS.findall(feed_title))
+        if not years_in_feed:
+            return None
+
+        feed_text = normalize_match_text(feed_title)
+        tokens = feed_text.split(" ") if feed_text else []
+
+        best = None
+        for position in self._phrase_hits(tokens):
+            if best is not None and position >= best:
+                continue
+
+            film_name, film_year, _ = self.entries[position]
+            if not film_year or film_year not in years_in_feed:
+                continue
+            if f"{film_name.lower()}_{film_year}" in skip_keys:
+                continue
+            if self.exclude_problematic and is_problematic_substring_match(
+                film_name, feed_title
+            ):
+                continue
+
+            best = position
+
+        if best is None:
+            if self.fuzzy:
+                return self._fuzzy_match(feed_title, years_in_feed, skip_keys)
+            return None
+
+        film_name, film_year, _ = self.entries[best]
+        return film_name, film_year
+
+    def _fuzzy_match(self, feed_title, years_in_feed, skip_keys):
+        """Bester unscharfer Treffer für den Titelteil vor einer Jahreszahl oder None."""
+        tokens = fold_match_text(feed_title).split()
+        best = None
+
+        for i, token in enumerate(tokens):
+            postings = self._trigrams_by_year.get(token)
+            if not i or postings is None or token not in years_in_feed:
+                continue
+
+            query = trigrams(" ".join(tokens[:i]))
+            # Alle Kandidaten des Jahres in einem Durchlauf zählen
+            common = {}
+            for gram in query:
+                for position in postings.get(gram, ()):
+                    common[position] = common.get(position, 0) + 1
+
+            for position, shared in common.items():
+                score = 2 * shared / (len(query) + len(self._trigram_sets[position]))
+                if score < self.fuzzy_threshold:
+                    continue
+                if best is not None and (score, -position) <= best[:2]:
+                    continue
+
+                film_name, film_year, _ = self.entries[position]
+                if f"{film_name.lower()}_{film_year}" in skip_keys:
+                    continue
+                if not check_year_match(film_year, feed_title):
+                    continue
+                if self.exclude_problematic and is_problematic_substring_match(
+                    film_name, feed_title
+                ):
+                    continue
+                best = (score, -position, film_name, film_year)
+
+        if best is None:
+            return None
+
+        logging.debug(f"Unscharfer Treffer ({best[0]:.2f}): {best[2]} → {feed_title}")
+        return best[2], best[3]
+
+
 def load_watchlist_from_csv(csv_path=None, file_content=None):
     """Lädt die Watchlist aus einer CSV-Datei oder aus einem String."""
     if csv_path is None and file_content is None:
@@ -224,381 +624,3186 @@ def load_watchlist_from_csv(csv_path=None, file_content=None):
 
     return watchlist
 
-def load_watchlist_from_drive(_ignored=None):
-    """Lädt die Watchlist direkt aus deinem Google Sheet."""
-    try:
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(
-            "client_secret.json", scope
-        )
-        client = gspread.authorize(creds)
+def open_watchlist_spreadsheet(sheet_id=GOOGLE_SHEET_ID):
+    """Autorisiert gspread und öffnet die Watchlist-Tabelle."""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
 
-        sheet = client.open_by_key("").sheet1
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = ServiceAccountCredentials.from_json_keyfile_name(
+        "client_secret.json", scope
+    )
+    client = gspread.authorize(creds)
+    return client.open_by_key(sheet_id)
+
+
+def get_sheet_revision(spreadsheet):
+    """Änderungszeitpunkt (modifiedTime) der Tabelle laut Drive-API."""
+    if hasattr(spreadsheet, "get_lastUpdateTime"):
+        return spreadsheet.get_lastUpdateTime()
+    # Ältere gspread-Versionen lesen modifiedTime beim Öffnen mit
+    return spreadsheet.client.open_by_key(spreadsheet.id).lastUpdateTime
+
+
+def read_watchlist_sheet(worksheet):
+    """Liest die Filme (Name, Year) aus dem Tabellenblatt."""
+    records = worksheet.get_all_records()
+
+    watchlist = []
+    for row in records:
+        title = str(row.get("Name") or "").strip()
+        year = str(row.get("Year") or "").strip()
+        if title:
+            watchlist.append((title.lower(), year))
 
-        records = sheet.get_all_records()
+    return watchlist
 
-        watchlist = []
-        for row in records:
-            title = str(row.get("Name") or "").strip()
-            year = str(row.get("Year") or "").strip()
-            if title:
-                watchlist.append((title.lower(), year))
 
-        return watchlist
+def load_watchlist_from_drive(_ignored=None):
+    """Lädt die Watchlist direkt aus deinem Google Sheet."""
+    try:
+        return read_watchlist_sheet(open_watchlist_spreadsheet().sheet1)
 
     except Exception as e:
         logging.error(f"Fehler beim Laden aus Google Sheet: {e}")
         return []
 
 
+class WatchlistProvider:
+    """
+    Hält die Watchlist zur Laufzeit aktuell.
+
+    Geprüft wird nur die Änderungszeit des Google Sheets bzw. mtime und
+    Hash der CSV-Datei; neu geladen wird erst bei einer Änderung, und der
+    Matching-Index wird inkrementell angepasst. Ein lokaler Snapshot dient
+    als Warmstart und hält den Watcher am Laufen, wenn Google nicht
+    erreichbar ist. Er enthält die bereits normalisierten Wortgruppen
+    (marshal), sodass der Index beim Start ohne Normalisierung entsteht.
+    """
 
-def get_dynamic_feed_url():
-    """Ermittelt die RSS-Feed-URL dynamisch."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36"
-    }
-    url = "https://www.hdencode.org"
+    SOURCE_NAMES = {"drive": "Google Drive", "csv": "lokale csv-Datei"}
+    SNAPSHOT_FORMAT = 1  # erhöhen, wenn sich normalize_match_text() ändert
+
+    def __init__(self, cache_path=WATCHLIST_CACHE_FILE, csv_path=WATCHLIST_CSV,
+                 sheet_id=GOOGLE_SHEET_ID):
+        self.cache_path = cache_path
+        self.csv_path = csv_path
+        self.sheet_id = sheet_id
+        self.index = WatchlistIndex([])
+        self.version = 0      # Zählt inhaltliche Änderungen
+        self.source = None    # "drive" oder "csv"
+        self.revision = None  # modifiedTime des Sheets bzw. Hash der CSV
+        self.csv_stat = None
+        self.from_snapshot = False
+        self.last_check = None
+        self.last_change = None
+        self._spreadsheet = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def load(self, refresh=True):
+        """
+        Erstes Laden: Snapshot übernehmen, danach mit der Quelle abgleichen.
+        Mit refresh=False wird nur ohne Snapshot sofort abgeglichen, sonst
+        bleibt der Abgleich dem nächsten refresh() überlassen.
+        Liefert die Quelle, die geantwortet hat ("drive"/"csv"),
+        "snapshot" beim Warmstart ohne Abgleich oder None.
+        """
+        self._load_snapshot()
+        if not refresh and len(self.index):
+            return "snapshot"
+        return self.refresh()
+
+    def refresh(self):
+        """
+        Prüft die Watchlist auf Änderungen und übernimmt sie. Die CSV-Datei
+        wird nur genutzt, solange keine Watchlist aus Google Drive vorliegt.
+        Liefert die Quelle, die geantwortet hat, oder None.
+        """
+        self.last_check = datetime.now()
+        with metrics.timer("watchlist_refresh"):
+            if self._refresh_drive():
+                self.from_snapshot = False
+                return "drive"
+            if self.source != "drive" or not len(self.index):
+                if self._refresh_csv():
+                    self.from_snapshot = False
+                    return "csv"
+        if len(self.index):
+            logging.warning("Watchlist-Quelle nicht erreichbar – behalte aktuelle Watchlist")
+        return None
+
+    def _refresh_drive(self):
+        if not self.sheet_id:
+            return False
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        link = soup.find("link", {"type": "application/rss+xml"})
-        if link and link.get("href"):
-            feed_url = link["href"]
-            logging.info(f"Feed-URL gefunden: {feed_url}")
-            return feed_url
-    except Exception as e:
-        logging.warning(f"Feed-URL konnte nicht ermittelt werden: {e}")
+        try:
+            if self._spreadsheet is None:
+                self._spreadsheet = open_watchlist_spreadsheet(self.sheet_id)
+            revision = get_sheet_revision(self._spreadsheet)
+            if self.source == "drive" and revision and revision == self.revision:
+                return True
+            watchlist = read_watchlist_sheet(self._spreadsheet.sheet1)
+        except Exception as e:
+            logging.error(f"Fehler beim Prüfen des Google Sheets: {e}")
+            self._spreadsheet = None  # beim nächsten Versuch neu autorisieren
+            return False
+
+        if not watchlist:
+            logging.warning("Google Sheet enthält keine Filme")
+            return False
+
+        self._apply(watchlist, "drive", revision)
+        return True
+
+    def _refresh_csv(self):
+        if not self.csv_path:
+            return False
+
+        try:
+            stat = os.stat(self.csv_path)
+            csv_stat = [stat.st_mtime_ns, stat.st_size]
+            if self.source == "csv" and csv_stat == self.csv_stat:
+                return True
+
+            with open(self.csv_path, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            logging.warning(f"Watchlist CSV nicht lesbar: {e}")
+            return False
+
+        self.csv_stat = csv_stat
+        revision = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if self.source == "csv" and revision == self.revision:
+            return True
+
+        watchlist = load_watchlist_from_csv(file_content=content.decode("utf-8-sig"))
+        if not watchlist:
+            return False
+
+        self._apply(watchlist, "csv", revision)
+        return True
+
+    def _apply(self, watchlist, source, revision):
+        with watchlist_lock:
+            added, removed = self.index.update(watchlist)
+
+        self.source = source
+        self.revision = revision
+        if added or removed:
+            self.version += 1
+            self.last_change = datetime.now()
+            logging.info(
+                f"📋 Watchlist aktualisiert ({self.SOURCE_NAMES[source]}): "
+                f"+{added} / -{removed}, {len(self.index)} Filme"
+            )
+
+        metrics.inc("hdencode_watchlist_reloads_total", source=source)
+        metrics.set_gauge("hdencode_watchlist_size", len(self.index))
+        self._save_snapshot()
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, "rb") as f:
+                snapshot = marshal.load(f)
+            if snapshot.get("format") != self.SNAPSHOT_FORMAT:
+                raise ValueError(f"unbekanntes Format {snapshot.get('format')}")
+            watchlist = [(name, year) for name, year, _ in snapshot["watchlist"]]
+            words = {(name, year): words for name, year, words in snapshot["watchlist"]}
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des Watchlist-Snapshots: {e}")
+            return
+
+        with watchlist_lock:
+            self.index.update(watchlist, words)
+        self.version += 1
+        self.source = snapshot.get("source")
+        self.revision = snapshot.get("revision")
+        self.csv_stat = snapshot.get("csv_stat")
+        self.from_snapshot = True
+        logging.info(f"📋 Watchlist-Snapshot geladen ({len(self.index)} Filme)")
+
+    def _save_snapshot(self):
+        with watchlist_lock:
+            entries = [entry for entry in self.index.entries if entry is not None]
+        snapshot = {
+            "format": self.SNAPSHOT_FORMAT,
+            "source": self.source,
+            "revision": self.revision,
+            "csv_stat": self.csv_stat,
+            "watchlist": entries,
+        }
+        try:
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                marshal.dump(snapshot, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des Watchlist-Snapshots: {e}")
 
-    fallback = "https://hdencode.org/feed/?sfw=pass1751722421"
-    logging.info(f"Verwende Fallback-Feed: {fallback}")
-    return fallback
+    def describe(self):
+        """Kurzbeschreibung für /status."""
+        source = self.SOURCE_NAMES.get(self.source, "unbekannt")
+        if self.from_snapshot:
+            source += ", Snapshot"
+        checked = self.last_check.strftime('%H:%M:%S') if self.last_check else "nie"
+        return f"📋 Watchlist: {len(self.index)} Filme ({source}, geprüft {checked})"
 
 
-def load_seen_links(path=SEEN_LINKS_FILE):
-    """Lädt bereits gesehene Links."""
+Subscriber = namedtuple("Subscriber", "chat_id name provider")
+
+
+def load_subscribers(path=SUBSCRIBERS_FILE):
+    """
+    Liest die Abonnenten aus subscribers.json, z. B.
+    [{"name": "anna", "chat_id": "123", "sheet_id": "...", "csv": "anna.csv"}].
+    Ohne Datei gibt es nur den Standard-Abonnenten aus der Konfiguration.
+    """
+    default = [Subscriber(TELEGRAM_CHAT_ID, "Standard", WatchlistProvider())]
     if not os.path.exists(path):
-        return set()
+        return default
 
     try:
         with open(path, "r", encoding="utf-8") as f:
-            return set(line.strip() for line in f if line.strip())
+            config = json.load(f)
     except Exception as e:
-        logging.error(f"Fehler beim Laden der seen_links: {e}")
-        return set()
+        logging.error(f"Fehler beim Laden der Abonnenten: {e}")
+        return default
+
+    result = []
+    for entry in config:
+        chat_id = str(entry.get("chat_id") or "").strip()
+        if not chat_id:
+            logging.warning(f"Abonnent ohne chat_id übersprungen: {entry}")
+            continue
 
+        csv_path = entry.get("csv")
+        provider = WatchlistProvider(
+            cache_path=os.path.join(SCRIPT_DIR, f"watchlist_cache_{chat_id}.bin"),
+            csv_path=os.path.join(SCRIPT_DIR, csv_path) if csv_path else None,
+            sheet_id=entry.get("sheet_id"),
+        )
+        result.append(Subscriber(chat_id, entry.get("name") or chat_id, provider))
 
-def save_seen_link(link, path=SEEN_LINKS_FILE):
-    """Speichert einen gesehenen Link."""
-    try:
-        with seen_links_lock:
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(link + "\n")
-    except Exception as e:
-        logging.error(f"Fehler beim Speichern des Links: {e}")
+    return result or default
 
 
-def send_telegram_message(message):
-    """Sendet eine Telegram-Nachricht."""
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message,
-        "parse_mode": "HTML",
-        "disable_web_page_preview": True
-    }
+class SubscriberRegistry:
+    """
+    Mehrere Abonnenten mit eigener Watchlist auf einem gemeinsamen Feed.
 
-    try:
-        response = requests.post(url, json=payload, timeout=10)
-        if response.status_code == 200:
-            logging.info("Telegram-Nachricht gesendet")
-        else:
-            logging.warning(
-                f"Telegram API Fehler: {response.status_code} - "
-                f"{response.text}"
-            )
-    except Exception as e:
-        logging.error(f"Telegram-Sendefehler: {e}")
+    Alle Watchlists werden zu einem gemeinsamen WatchlistIndex
+    zusammengefasst, wanted_by ordnet jeden Film den Chats zu, die ihn
+    beobachten. Der Feed wird so pro Zyklus einmal abgerufen und einmal
+    abgeglichen, unabhängig von der Zahl der Abonnenten.
+    """
 
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.index = WatchlistIndex([], fuzzy=FUZZY_MATCHING)
+        self.wanted_by = {}
+        self._versions = None
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def chat_ids(self):
+        return [subscriber.chat_id for subscriber in self.subscribers]
+
+    def load(self, refresh=True):
+        """Lädt alle Watchlists; liefert {chat_id: Quelle} (siehe WatchlistProvider.load)."""
+        sources = {
+            subscriber.chat_id: subscriber.provider.load(refresh)
+            for subscriber in self.subscribers
+        }
+        self._combine()
+        return sources
+
+    def refresh(self):
+        """Prüft alle Watchlists auf Änderungen und aktualisiert den gemeinsamen Index."""
+        for subscriber in self.subscribers:
+            subscriber.provider.refresh()
+        self._combine()
+
+    def _combine(self):
+        versions = [subscriber.provider.version for subscriber in self.subscribers]
+        if versions == self._versions:
+            return
 
-def handle_search(update: Update, context: CallbackContext):
-    if not context.args:
-        update.message.reply_text("🔍 Bitte gib einen Suchbegriff an. Beispiel: /suche inception")
-        return
+        wanted_by = {}
+        words = {}
+        for subscriber in self.subscribers:
+            normalized = subscriber.provider.index.normalized()
+            words.update(normalized)
+            for film in normalized:
+                wanted_by.setdefault(film, set()).add(subscriber.chat_id)
 
-    query = " ".join(context.args).lower()
-    feed_url = get_dynamic_feed_url()
-    posts = get_rss_posts(feed_url)
+        with watchlist_lock:
+            self.index.update(wanted_by, words)
+            self.wanted_by = wanted_by
+        self._versions = versions
+        metrics.set_gauge("hdencode_watchlist_combined_size", len(self.index))
 
-    matches = []
-    for title, link in posts:
-        if query in title.lower():
-            matches.append(f"🎬 <b>{title}</b>\n🔗 <a href='{link}'>Download</a>")
+    def describe(self):
+        """Kurzbeschreibung für /status."""
+        if len(self.subscribers) == 1:
+            return self.subscribers[0].provider.describe()
 
-    if matches:
-        for msg in matches[:5]:
-            update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=True)
-        if len(matches) > 5:
-            update.message.reply_text(f"... {len(matches)-5} weitere Treffer gefunden.")
-    else:
-        update.message.reply_text("❌ Kein Treffer gefunden")
+        lines = [f"👥 {len(self.subscribers)} Abonnenten, {len(self.index)} Filme gesamt"]
+        for subscriber in self.subscribers:
+            lines.append(f"  👤 {subscriber.name}: {subscriber.provider.describe()}")
+        return "\n".join(lines)
 
 
-def search_hdencode_pages(query, max_pages=10):
-    """Durchsucht mehrere Seiten der HDEncode-Webseite nach Titeln, die den Suchbegriff enthalten."""
-    base_url = "https://www.hdencode.org/page/{}/"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    query = query.lower()
-    results = []
+async def run_watchlist_refresh():
+    """
+    Prüft die Watchlists regelmäßig auf Änderungen, bis die Laufzeit endet.
+    Der erste Abgleich läuft sofort, damit ein Warmstart aus dem Snapshot
+    zeitnah mit Google Drive bzw. der CSV-Datei abgeglichen wird.
+    """
+    loop = asyncio.get_running_loop()
+    while running.is_set():
+        if subscribers is not None:
+            await loop.run_in_executor(None, subscribers.refresh)
+        await asyncio.sleep(WATCHLIST_REFRESH_INTERVAL)
 
-    for page_num in range(1, max_pages + 1):
-        url = base_url.format(page_num)
-        try:
-            resp = requests.get(url, headers=headers, timeout=30)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            entries = soup.find_all("h2", class_="title")
 
-            for entry in entries:
-                a_tag = entry.find("a")
-                if a_tag and query in a_tag.text.lower():
-                    title = a_tag.text.strip()
-                    link = a_tag["href"]
-                    results.append((title, link))
-        except Exception as e:
-            logging.warning(f"Fehler bei Seite {page_num}: {e}")
-            continue
 
-    return results
+class SingleFlightCache:
+    """
+    Thread-sicherer TTL-Cache mit Zusammenlegung gleichzeitiger Abrufe:
+    Fragen mehrere Threads denselben abgelaufenen Schlüssel an, lädt nur
+    einer, die anderen warten auf dessen Ergebnis.
+    """
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._inflight = {}
 
-def handle_search_all(update: Update, context: CallbackContext):
-    if not context.args:
-        update.message.reply_text("🔍 Bitte gib einen Suchbegriff an. Beispiel: /suchealle dune")
-        return
+    def get(self, key, loader, ttl):
+        """Liefert den gecachten Wert oder lädt ihn über loader(); None wird nicht gecacht."""
+        with self._lock:
+            cached = self._values.get(key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                return cached[1]
 
-    query = " ".join(context.args).strip()
-    update.message.reply_text(f"🔎 Suche nach '{query}' im gesamten HDEncode-Katalog...")
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = {"event": threading.Event(), "value": None}
 
-    results = search_hdencode_pages(query, max_pages=25)
+        if not leader:
+            flight["event"].wait()
+            return flight["value"]
 
-    if results:
-        for title, link in results[:5]:
-            update.message.reply_text(
-                f"🎬 <b>{title}</b>\n🔗 <a href='{link}'>Download</a>",
-                parse_mode='HTML',
-                disable_web_page_preview=True
-            )
-        if len(results) > 5:
-            update.message.reply_text(f"... {len(results)-5} weitere Treffer gefunden")
-    else:
-        update.message.reply_text("❌ Kein Treffer gefunden")
+        try:
+            value = loader()
+            flight["value"] = value
+            if value is not None:
+                self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["event"].set()
 
-def handle_status(update: Update, context: CallbackContext):
-    status = "🟢 Läuft" if running.is_set() else "🔴 Gestoppt"
-    last_check = (
-        last_check_time.strftime('%Y-%m-%d %H:%M:%S') if last_check_time else "Nie"
-    )
-    update.message.reply_text(f"{status}\n🕒 Letzter Check: {last_check}")
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = (time.monotonic(), value)
 
-def start_telegram_bot():
-    """Startet den Telegram-Bot mit Befehlshandlern."""
-    updater = Updater(TELEGRAM_TOKEN, use_context=True)
-    updater.start_polling(drop_pending_updates=True)
-    dp = updater.dispatcher
-    dp.add_handler(CommandHandler("suche", handle_search))
-    dp.add_handler(CommandHandler("status", handle_status))
-    dp.add_handler(CommandHandler("suchealle", handle_search_all))
-    logging.info("Telegram-Bot läuft und wartet auf Kommandos.")
+    def peek(self, key):
+        """Letzter geladener Wert unabhängig vom Alter oder None (für Ausfälle)."""
+        with self._lock:
+            cached = self._values.get(key)
+            return cached[1] if cached else None
 
+    def touch(self, key):
+        """Verlängert die Gültigkeit eines vorhandenen Eintrags (z. B. nach 304)."""
+        with self._lock:
+            if key in self._values:
+                self._values[key] = (time.monotonic(), self._values[key][1])
 
-def get_rss_posts(feed_url):
-    """Ruft RSS-Feed-Einträge ab."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36"
-    }
 
-    try:
-        response = requests.get(feed_url, headers=headers, timeout=15)
-        response.raise_for_status()
+http_cache = SingleFlightCache()
 
-        feed = feedparser.parse(response.text)
 
-        if hasattr(feed, 'bozo') and feed.bozo:
-            logging.warning(
-                f"RSS-Feed hat Parsing-Probleme: {feed.bozo_exception}"
-            )
+def discover_feed_url():
+    """Liest die RSS-Feed-URL von der Startseite oder liefert None."""
+    with metrics.timer("get_dynamic_feed_url"):
+        return _discover_feed_url()
 
-        posts = []
-        for entry in feed.entries:
-            if hasattr(entry, 'title') and hasattr(entry, 'link'):
-                posts.append((entry.title.strip(), entry.link.strip()))
 
-        return posts
+def _discover_feed_url():
+    url = HDENCODE_BASE_URL
 
+    try:
+        response = http_client.get(url, timeout=10)
+        response.raise_for_status()
+        feed_url = extract_feed_link(response.text)
+        if feed_url:
+            logging.info(f"Feed-URL gefunden: {feed_url}")
+            return feed_url
     except Exception as e:
-        logging.error(f"RSS-Feed Fehler: {e}")
-        return []
+        logging.warning(f"Feed-URL konnte nicht ermittelt werden: {e}")
 
+    return None
 
-def find_matches(watchlist, feed_posts, seen_links):
-    matches = []
-    found_films = set()  # Tracking für bereits gefundene Filme
 
-    logging.info(
-        f"Starte Matching mit {len(watchlist)} Watchlist-Einträgen "
-        f"und {len(feed_posts)} Feed-Posts"
-    )
+def get_dynamic_feed_url():
+    """Ermittelt die RSS-Feed-URL dynamisch (gecacht für FEED_URL_TTL)."""
+    feed_url = http_cache.get("feed_url", discover_feed_url, FEED_URL_TTL)
+    if feed_url:
+        return feed_url
 
-    for title, link in feed_posts:
-        if link in seen_links:
-            continue
+    # Abgelaufene, aber bekannte URL ist besser als der statische Fallback
+    feed_url = http_cache.peek("feed_url")
+    if feed_url:
+        return feed_url
 
-        title_clean = title.lower()
-        logging.debug(f"Prüfe Feed-Titel: {title_clean}")
+    logging.info(f"Verwende Fallback-Feed: {FALLBACK_FEED_URL}")
+    return FALLBACK_FEED_URL
 
-        for film_name, film_year in watchlist:
-            # Erstelle einen eindeutigen Schlüssel für den Film
-            film_key = f"{film_name.lower()}_{film_year}"
 
-            # Überspringe wenn dieser Film bereits gefunden wurde
-            if film_key in found_films:
-                continue
+class BloomFilter:
+    """Einfacher Bloom-Filter über 64-Bit-Schlüssel (Double Hashing)."""
 
-            # Verbesserte Titel-Übereinstimmung
-            if is_title_match(film_name, film_year, title_clean):
-                match = {
-                    'film_name': film_name,
-                    'film_year': film_year,
-                    'feed_title': title,
-                    'link': link
-                }
-                matches.append(match)
-                found_films.add(film_key)  # Markiere als gefunden
-                logging.info(
-                    f"✅ Match: {film_name} ({film_year}) → {title}"
-                )
-                break  # Stoppe weitere Suche für diesen Feed-Titel
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1000)
+        self.size = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
 
-    logging.info(f"Matching abgeschlossen: {len(matches)} Matches gefunden")
-    return matches
+    def _positions(self, key):
+        h1 = key & 0xFFFFFFFF
+        h2 = ((key >> 32) & 0xFFFFFFFF) | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
 
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
 
-def run_watcher():
-    """Hauptfunktion des Watchers."""
-    global last_check_time
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
 
-    try:
-        # Initialisierung
-        seen_links = load_seen_links()
-        watchlist = load_watchlist_from_drive()
 
-        if not watchlist:
-            send_telegram_message("⚠️ Konnte Watchlist nicht von Google Drive laden. Fallback auf lokale csv-Datei")
-            watchlist = load_watchlist_from_csv()
+class SeenStore:
+    """
+    Kompakter, begrenzter Speicher für bereits benachrichtigte Links.
 
-        if not watchlist:
-            logging.warning("Keine Watchlist gefunden. Prüfe Google Drive oder file_ID")
-            send_telegram_message("Fehler beim Laden der Watchlist auf Google Drive")
-            return
-        else:
-            send_telegram_message(f"✅ Watchlist erfolgreich von Google Drive geladen ({len(watchlist)} Filme)")
+    Links werden als 64-Bit-Hash in SQLite abgelegt, Schreibzugriffe
+    gebündelt und Einträge älter als `max_age_days` entfernt, da Links, die
+    längst aus dem Feed gefallen sind, nicht zurückkommen. Ein optionaler
+    Bloom-Filter beantwortet negative Abfragen ohne Datenbankzugriff.
+    """
 
-        print(f"🎥 Watchlist geladen: {len(watchlist)} Filme")
-        for film, year in watchlist[:5]:  # Zeige erste 5
-            print(f"  → {film} ({year})")
-        if len(watchlist) > 5:
-            print(f"  ... und {len(watchlist) - 5} weitere")
+    def __init__(self, path=SEEN_DB_FILE, max_age_days=SEEN_MAX_AGE_DAYS,
+                 use_bloom=SEEN_USE_BLOOM):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.use_bloom = use_bloom
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._last_maintenance = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                " key INTEGER PRIMARY KEY,"
+                " added REAL NOT NULL)"
+            )
+        self._bloom = None
+        self._rebuild_bloom()
 
-        feed_url = get_dynamic_feed_url()
-        send_telegram_message(
-            "🚀 HDEncode Watcher gestartet"
-        )
+    @staticmethod
+    def key(link):
+        digest = hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
 
-        # Hauptschleife
-        while running.is_set():
+    def _rebuild_bloom(self):
+        if not self.use_bloom:
+            return
+        with seen_links_lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            bloom = BloomFilter(capacity=count * 2)
+            for (key,) in self._conn.execute("SELECT key FROM seen"):
+                bloom.add(key)
+            for key in self._pending:
+                bloom.add(key)
+            self._bloom = bloom
+
+    def __contains__(self, link):
+        key = self.key(link)
+        with seen_links_lock:
+            if key in self._pending:
+                return True
+            if self._bloom is not None and key not in self._bloom:
+                return False
+            return self._conn.execute(
+                "SELECT 1 FROM seen WHERE key = ?", (key,)
+            ).fetchone() is not None
+
+    def __len__(self):
+        with seen_links_lock:
+            stored = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            return stored + len(self._pending)
+
+    def add(self, link):
+        key = self.key(link)
+        with seen_links_lock:
+            self._pending[key] = time.time()
+            if self._bloom is not None:
+                self._bloom.add(key)
+                if self._bloom.count > self._bloom.capacity:
+                    # Voll: beim nächsten flush() größer neu aufbauen
+                    self._bloom = None
+            flush_due = (
+                len(self._pending) >= SEEN_FLUSH_BATCH
+                or time.monotonic() - self._last_flush >= SEEN_FLUSH_INTERVAL
+            )
+        if flush_due:
+            self.flush()
+
+    def flush(self):
+        """Schreibt gebündelte Einträge und führt bei Bedarf die Wartung aus."""
+        with seen_links_lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
             try:
-                last_check_time = datetime.now()
-                logging.info(
-                    f"Starte Check um {last_check_time.strftime('%H:%M:%S')}"
+                if pending:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO seen (key, added) VALUES (?, ?)",
+                            pending.items(),
+                        )
+            except Exception as e:
+                self._pending.update(pending)
+                logging.error(f"Fehler beim Speichern der seen_links: {e}")
+                return
+
+        if self.use_bloom and self._bloom is None:
+            self._rebuild_bloom()
+        if time.time() - self._last_maintenance >= SEEN_MAINTENANCE_INTERVAL:
+            self.evict()
+
+    def evict(self):
+        """Entfernt alte Einträge und verdichtet die Datei, wenn sich das lohnt."""
+        cutoff = time.time() - self.max_age
+        try:
+            with seen_links_lock:
+                self._last_maintenance = time.time()
+                with self._conn:
+                    removed = self._conn.execute(
+                        "DELETE FROM seen WHERE added < ?", (cutoff,)
+                    ).rowcount
+                remaining = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+                if removed and removed >= remaining // 4:
+                    self._conn.execute("VACUUM")
+            if removed:
+                logging.info(f"{removed} alte seen_links entfernt")
+                self._rebuild_bloom()
+        except Exception as e:
+            logging.error(f"Fehler bei der Wartung der seen_links: {e}")
+
+    def migrate_text_file(self, path):
+        """Übernimmt einmalig die alte seen_links.txt und benennt sie um."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                links = [line.strip() for line in f if line.strip()]
+            now = time.time()
+            with seen_links_lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO seen (key, added) VALUES (?, ?)",
+                    ((self.key(link), now) for link in links),
                 )
+            os.replace(path, path + ".migrated")
+            self._rebuild_bloom()
+            logging.info(f"{len(links)} Links aus {path} übernommen")
+        except Exception as e:
+            logging.error(f"Fehler bei der Migration der seen_links: {e}")
 
-                # RSS-Feed abrufen
-                posts = get_rss_posts(feed_url)
-                if not posts:
-                    logging.warning("Keine RSS-Posts erhalten")
-                    time.sleep(CHECK_INTERVAL)
-                    continue
 
-                logging.info(f"📦 {len(posts)} Feed-Einträge erhalten")
+def load_seen_links(path=SEEN_DB_FILE, legacy_path=SEEN_LINKS_FILE):
+    """Öffnet den Speicher bereits gesehener Links (inkl. Migration der Textdatei)."""
+    global seen_store
 
-                # Matches suchen
-                matches = find_matches(watchlist, posts, seen_links)
+    seen_store = SeenStore(path)
+    if legacy_path and os.path.exists(legacy_path):
+        seen_store.migrate_text_file(legacy_path)
+    return seen_store
 
-                # Matches verarbeiten
-                for match in matches:
-                    message = (
-                        f"🎬 <b>{match['feed_title']}</b>\n"
-                        f"📅 Match: {match['film_name']} "
-                        f"({match['film_year']})\n"
-                        f"🔗 <a href='{match['link']}'>Download</a>"
-                    )
 
-                    send_telegram_message(message)
-                    seen_links.add(match['link'])
-                    save_seen_link(match['link'])
+def seen_key(link, chat_id=None):
+    """Schlüssel im SeenStore: der Link selbst für den Standard-Chat, sonst pro Chat."""
+    if not chat_id or chat_id == TELEGRAM_CHAT_ID:
+        return link
+    return f"{chat_id}|{link}"
 
-                if matches:
-                    logging.info(f"✅ {len(matches)} neue Matches gefunden")
 
-            except Exception as e:
-                logging.error(f"Fehler im Watcher-Loop: {e}")
+def save_seen_link(link):
+    """Speichert einen gesehenen Link."""
+    if seen_store is None:
+        load_seen_links()
+    seen_store.add(link)
 
-            # Warten mit Unterbrechbarkeit
-            for _ in range(CHECK_INTERVAL):
-                if not running.is_set():
-                    break
-                time.sleep(1)
 
+def post_telegram_message(chat_id, message):
+    """
+    Sendet eine Telegram-Nachricht direkt über die gemeinsame Session.
+    Liefert (ok, retry_after, permanent): retry_after bei Rate-Limit (429),
+    permanent bei Fehlern, die eine Wiederholung nicht behebt.
+    """
+    url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage"
+    payload = {
+        "chat_id": chat_id,
+        "text": message,
+        "parse_mode": "HTML",
+        "disable_web_page_preview": True
+    }
+
+    try:
+        with metrics.timer("send_telegram_message"):
+            response = http_client.post(url, json=payload, timeout=10)
+        if response.status_code == 200:
+            logging.info("Telegram-Nachricht gesendet")
+            return True, None, False
+
+        logging.warning(
+            f"Telegram API Fehler: {response.status_code} - "
+            f"{response.text}"
+        )
+        if response.status_code == 429:
+            try:
+                retry_after = response.json()["parameters"]["retry_after"]
+            except Exception:
+                retry_after = 5
+            return False, float(retry_after), False
+        return False, None, 400 <= response.status_code < 500
     except Exception as e:
-        logging.error(f"Kritischer Fehler im Watcher: {e}")
-        send_telegram_message(f"❌ Watcher-Fehler: {e}")
+        logging.error(f"Telegram-Sendefehler: {e}")
+        return False, None, False
 
 
-def handle_exit(signum, frame):
-    """Signal-Handler für sauberes Beenden."""
-    logging.info("Beende Watcher...")
-    running.clear()
-    sys.exit(0)
+class TokenBucket:
+    """Token-Bucket-Ratenbegrenzung für asyncio-Tasks."""
 
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
 
-def main():
-    """Startet den Watcher im Hintergrund (ohne Tray)."""
-    signal.signal(signal.SIGINT, handle_exit)
-    signal.signal(signal.SIGTERM, handle_exit)
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
 
-    telegram_thread = threading.Thread(target=start_telegram_bot, daemon=True)
-    telegram_thread.start()
 
-    watcher_thread = threading.Thread(target=run_watcher, daemon=False)
-    watcher_thread.start()
+def split_message(text, limit=TELEGRAM_MAX_LENGTH):
+    """
+    Teilt einen Text in Teile bis limit Zeichen, und zwar an Zeilenenden,
+    damit Einträge und ihre HTML-Tags nicht zerschnitten werden. Nur eine
+    einzelne Zeile über limit wird hart geteilt.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    parts = []
+    current = None
+    for line in text.split("\n"):
+        for piece in [line[i:i + limit] for i in range(0, len(line), limit)] or [""]:
+            if current is None:
+                current = piece
+            elif len(current) + 1 + len(piece) <= limit:
+                current += "\n" + piece
+            else:
+                parts.append(current)
+                current = piece
+    parts.append(current)
+    # Leerzeilen an den Schnittstellen entfernen
+    return [part.strip("\n") for part in parts if part.strip()]
 
-    try:
-        while watcher_thread.is_alive():
-            watcher_thread.join(timeout=1)
-    except KeyboardInterrupt:
-        logging.info("KeyboardInterrupt empfangen, Watcher wird beendet.")
-        running.clear()
-        watcher_thread.join()
+
+class NotificationQueue:
+    """
+    Persistente Warteschlange für ausgehende Telegram-Nachrichten.
+
+    Nachrichten werden in PENDING_MESSAGES_FILE gespeichert und von einem
+    Hintergrund-Task mit Token-Bucket pro Chat zugestellt. Neue Nachrichten
+    werden gebündelt mit flush() geschrieben (nach jedem Watcher-Zyklus und
+    vor jeder Zustellrunde), nicht bei jedem enqueue. Mehrere wartende
+    Nachrichten werden zu Sammelnachrichten bis TELEGRAM_MAX_LENGTH Zeichen
+    zusammengefasst, retry_after wird eingehalten. Die zugehörigen Links
+    werden erst nach erfolgreichem Versand als gesehen gespeichert.
+    """
+
+    def __init__(self, path=PENDING_MESSAGES_FILE, group_window=None):
+        self.path = path
+        self.group_window = self._parse_window(
+            NOTIFY_GROUP_WINDOW if group_window is None else group_window
+        )
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Hält die Schreibreihenfolge ein
+        self._dirty = False
+        self._items = []
+        self._loop = None
+        self._wakeup = None
+        self._buckets = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._items = json.load(f)
+            if self._items:
+                logging.info(f"{len(self._items)} unzugestellte Nachrichten geladen")
+        except Exception as e:
+            logging.error(f"Fehler beim Laden der Nachrichten-Warteschlange: {e}")
+
+    @staticmethod
+    def _parse_window(window):
+        """Sammelzeit in Sekunden; ungültige oder negative Werte senden sofort."""
+        try:
+            window = float(window)
+        except (TypeError, ValueError):
+            logging.warning(f"Ungültiges NOTIFY_GROUP_WINDOW {window!r} – Releases werden sofort gesendet")
+            return 0.0
+        if math.isnan(window):
+            return 0.0
+        return max(window, 0.0)
+
+    def _save(self):
+        """Schreibt die Warteschlange; nicht unter self._lock aufrufen."""
+        with self._save_lock:
+            try:
+                with self._lock:
+                    data = json.dumps(self._items, ensure_ascii=False)
+                    self._dirty = False
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                self._dirty = True
+                logging.error(f"Fehler beim Speichern der Nachrichten-Warteschlange: {e}")
+
+    def flush(self):
+        """Speichert die Warteschlange, falls seit dem letzten Speichern etwas eingereiht wurde."""
+        if self._dirty:
+            self._save()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def enqueue(self, text, links=(), chat_id=None):
+        """
+        Reiht eine Nachricht ein (thread-sicher); links werden nach Versand
+        gespeichert. Zu lange Texte werden an Absätzen/Zeilen aufgeteilt,
+        die Links hängen am letzten Teil.
+        """
+        parts = split_message(text)
+        items = [
+            {
+                "chat_id": chat_id or TELEGRAM_CHAT_ID,
+                "text": part,
+                "links": list(links) if i == len(parts) - 1 else [],
+                "attempts": 0,
+                "created": time.time(),
+            }
+            for i, part in enumerate(parts)
+        ]
+        with self._lock:
+            self._items.extend(items)
+            self._dirty = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def enqueue_release(self, film_name, film_year, variant, chat_id=None, window=None):
+        """
+        Reiht ein Release eines Films ein. Weitere Releases desselben Films
+        für denselben Chat werden bis zum Ablauf von window Sekunden
+        (Standard: group_window) in dieselbe Nachricht aufgenommen.
+        """
+        chat_id = chat_id or TELEGRAM_CHAT_ID
+        window = self.group_window if window is None else window
+        group = f"{chat_id}|{film_name}_{film_year}"
+
+        with self._lock:
+            for item in self._items:
+                # Bereits in Zustellung befindliche Nachrichten nicht mehr ändern
+                if item.get("group") == group and not item.get("sealed"):
+                    variants = item["variants"] + [variant]
+                    text = format_release_message(film_name, film_year, variants)
+                    if len(text) > TELEGRAM_MAX_LENGTH:
+                        # Voll: diese Nachricht abschließen, Release in eine neue
+                        item["sealed"] = True
+                        break
+                    item["variants"] = variants
+                    item["links"].append(variant["seen_key"])
+                    item["text"] = text
+                    self._dirty = True
+                    return
+
+            self._items.append({
+                "chat_id": chat_id,
+                "text": format_release_message(film_name, film_year, [variant]),
+                "links": [variant["seen_key"]],
+                "attempts": 0,
+                "created": time.time(),
+                "group": group,
+                "not_before": time.time() + window,
+                "variants": [variant],
+            })
+            self._dirty = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def is_pending(self, link):
+        with self._lock:
+            return any(link in item["links"] for item in self._items)
+
+    def _next_due_delay(self):
+        """Sekunden bis zur nächsten zurückgestellten Nachricht oder None."""
+        with self._lock:
+            deferred = [item["not_before"] for item in self._items if item.get("not_before")]
+        if not deferred:
+            return None
+        return max(0, min(deferred) - time.time())
+
+    def _next_batch(self):
+        """Fasst fällige Nachrichten des ältesten Chats zu einer Sammelnachricht zusammen."""
+        with self._lock:
+            now = time.time()
+            due = [item for item in self._items if (item.get("not_before") or 0) <= now]
+            if not due:
+                return None
+
+            chat_id = due[0]["chat_id"]
+            batch = []
+            length = 0
+            for item in due:
+                if item["chat_id"] != chat_id:
+                    continue
+                # Nach einem Fehler einzeln senden, damit eine Nachricht nicht alle blockiert
+                if batch and (item["attempts"] or batch[0]["attempts"]):
+                    break
+                added = len(item["text"]) + (2 if batch else 0)
+                if batch and length + added > TELEGRAM_MAX_LENGTH:
+                    break
+                batch.append(item)
+                length += added
+
+            for item in batch:
+                item["sealed"] = True
+            # Einzelne Nachrichten sind höchstens TELEGRAM_MAX_LENGTH lang
+            # (enqueue/enqueue_release), also wird nie mitten im Text geschnitten
+            text = "\n\n".join(item["text"] for item in batch)
+            return chat_id, batch, text
+
+    def _complete(self, batch, delivered):
+        """Trägt das Ergebnis einer Zustellung ein (blockierend, im Executor aufrufen)."""
+        with self._lock:
+            for item in batch:
+                if delivered or item["attempts"] >= NOTIFY_MAX_ATTEMPTS:
+                    if item in self._items:
+                        self._items.remove(item)
+                    if not delivered:
+                        logging.error(
+                            f"Nachricht nach {item['attempts']} Versuchen verworfen: "
+                            f"{item['text'][:80]}"
+                        )
+        self._save()
+
+        if delivered:
+            for item in batch:
+                for link in item["links"]:
+                    save_seen_link(link)
+
+    async def _send_pending(self):
+        loop = asyncio.get_running_loop()
+        failures = 0
+
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            chat_id, items, text = batch
+
+            bucket = self._buckets.setdefault(
+                chat_id, TokenBucket(TELEGRAM_RATE_PER_SEC, TELEGRAM_RATE_BURST)
+            )
+            await bucket.acquire()
+            ok, retry_after, permanent = await loop.run_in_executor(
+                None, post_telegram_message, chat_id, text
+            )
+
+            # Speichern und seen_links-Flush blockieren, nicht im Event-Loop ausführen
+            if ok:
+                failures = 0
+                await loop.run_in_executor(None, self._complete, items, True)
+                continue
+
+            metrics.inc("hdencode_retries_total", component="telegram")
+            with self._lock:
+                for item in items:
+                    item["attempts"] += NOTIFY_MAX_ATTEMPTS if permanent and len(items) == 1 else 1
+            await loop.run_in_executor(None, self._complete, items, False)
+
+            if retry_after:
+                await asyncio.sleep(retry_after)
+            elif not permanent:
+                failures += 1
+                await asyncio.sleep(min(2 ** failures, 300) * random.uniform(0.5, 1.0))
+
+    async def run(self):
+        """Hintergrund-Task: stellt Nachrichten zu, bis er abgebrochen wird."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        if len(self):
+            self._wakeup.set()
+
+        try:
+            while True:
+                # Aufwachen bei neuen Nachrichten oder wenn eine Gruppe fällig wird
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._next_due_delay())
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                # Kurz warten, um Bursts zu einer Sammelnachricht zu bündeln
+                await asyncio.sleep(NOTIFY_COALESCE_DELAY)
+                await self._loop.run_in_executor(None, self.flush)
+                await self._send_pending()
+        finally:
+            self._loop = None
+
+    async def drain(self, timeout):
+        """Versucht beim Beenden, noch wartende Nachrichten zuzustellen."""
+        try:
+            await asyncio.wait_for(self._send_pending(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"{len(self)} Nachrichten bleiben für den nächsten Start gespeichert")
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+
+notification_queue = NotificationQueue()
+
+
+def send_telegram_message(message, chat_id=None):
+    """Reiht eine Telegram-Nachricht zur Zustellung ein (Standard: TELEGRAM_CHAT_ID)."""
+    notification_queue.enqueue(message, chat_id=chat_id)
+
+
+class CatalogStore:
+    """
+    Lokaler Katalog aller gesehenen HDEncode-Posts (SQLite mit FTS5-Index).
+
+    Jeder RSS-Abruf und jeder Seiten-Crawl schreibt hier hinein, sodass
+    /suche und /suchealle ohne Live-Abruf beantwortet werden können.
+    """
+
+    def __init__(self, path=CATALOG_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self._create_schema()
+        except Exception:
+            self._conn.close()
+            raise
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " id INTEGER PRIMARY KEY,"
+                " link TEXT UNIQUE NOT NULL,"
+                " title TEXT NOT NULL,"
+                " year TEXT,"
+                " published REAL,"
+                " first_seen REAL NOT NULL,"
+                " in_feed INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS posts_in_feed ON posts (in_feed) WHERE in_feed = 1"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(norm_title)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def add_posts(self, posts, in_feed=False):
+        """Speichert (Titel, Link, Veröffentlichung, ...)-Tupel; bekannte Links bleiben erhalten."""
+        now = time.time()
+        added = 0
+        try:
+            with self._lock, self._conn:
+                for post in posts:
+                    title, link, published = post[:3]
+                    year_match = WatchlistIndex.FEED_YEARS.search(title)
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO posts "
+                        "(link, title, year, published, first_seen, in_feed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (link, title, year_match.group(0) if year_match else None,
+                         published, now, int(in_feed)),
+                    )
+                    if cursor.rowcount:
+                        self._conn.execute(
+                            "INSERT INTO posts_fts (rowid, norm_title) VALUES (?, ?)",
+                            (cursor.lastrowid, normalize_match_text(title)),
+                        )
+                        added += 1
+                    elif in_feed:
+                        self._conn.execute(
+                            "UPDATE posts SET in_feed = 1 WHERE link = ?", (link,)
+                        )
+        except Exception as e:
+            logging.error(f"Fehler beim Schreiben in den Katalog: {e}")
+        return added
+
+    def set_feed(self, posts):
+        """
+        Übernimmt das aktuelle Feed-Fenster: die Posts werden gespeichert und
+        als im Feed markiert, alle anderen verlieren die Markierung.
+        """
+        posts = list(posts)
+        added = self.add_posts(posts, in_feed=True)
+        links = {post[1] for post in posts}
+        try:
+            with self._lock, self._conn:
+                stale = [
+                    (link,) for (link,) in self._conn.execute(
+                        "SELECT link FROM posts WHERE in_feed = 1"
+                    ) if link not in links
+                ]
+                self._conn.executemany("UPDATE posts SET in_feed = 0 WHERE link = ?", stale)
+        except Exception as e:
+            logging.error(f"Fehler beim Aktualisieren der Feed-Einträge im Katalog: {e}")
+        return added
+
+    def search(self, query, limit=100, feed_only=False):
+        """Volltextsuche über die normalisierten Titel, beste Treffer zuerst."""
+        tokens = normalize_match_text(query).split()
+        if not tokens:
+            return []
+
+        fts_query = " ".join(f'"{token}"*' for token in tokens)
+        sql = (
+            "SELECT p.title, p.link FROM posts_fts f "
+            "JOIN posts p ON p.id = f.rowid "
+            "WHERE posts_fts MATCH ?"
+            + (" AND p.in_feed = 1" if feed_only else "")
+            + " ORDER BY bm25(posts_fts), COALESCE(p.published, p.first_seen) DESC"
+            " LIMIT ?"
+        )
+        try:
+            with self._lock:
+                return self._conn.execute(sql, (fts_query, limit)).fetchall()
+        except Exception as e:
+            logging.error(f"Fehler bei der Katalogsuche: {e}")
+            return []
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(value)),
+            )
+
+
+def get_catalog():
+    """
+    Liefert den gemeinsamen Katalog (wird beim ersten Zugriff geöffnet).
+
+    Lässt sich die Datenbank nicht öffnen (SQLite ohne FTS5, beschädigte
+    oder gesperrte Datei), wird None geliefert und erst nach
+    CATALOG_RETRY_INTERVAL erneut versucht. Aufrufer arbeiten dann ohne
+    Katalog weiter und suchen live.
+    """
+    global catalog, catalog_failed_at
+
+    with catalog_lock:
+        if catalog is None:
+            if (catalog_failed_at is not None
+                    and time.monotonic() - catalog_failed_at < CATALOG_RETRY_INTERVAL):
+                return None
+            try:
+                catalog = CatalogStore()
+                catalog_failed_at = None
+            except Exception as e:
+                catalog_failed_at = time.monotonic()
+                logging.error(f"Katalog nicht verfügbar, Suchen laufen live: {e}")
+                return None
+        return catalog
+
+
+def add_to_catalog(posts, feed=False):
+    """
+    Schreibt Posts in den Katalog, falls er verfügbar ist; Fehler werden nur
+    geloggt. Mit feed=True sind die Posts das aktuelle Feed-Fenster (siehe
+    CatalogStore.set_feed).
+    """
+    try:
+        store = get_catalog()
+        if store is not None:
+            if feed:
+                store.set_feed(posts)
+            else:
+                store.add_posts(posts)
+    except Exception as e:
+        logging.error(f"Fehler beim Schreiben in den Katalog: {e}")
+
+
+def backfill_catalog_step():
+    """
+    Erweitert den Katalog um die nächsten BACKFILL_PAGES_PER_RUN älteren Seiten.
+    Der Fortschritt wird in der meta-Tabelle des Katalogs gespeichert.
+    """
+    # Nach reset_timeout ist der erste Seitenabruf die Testanfrage, die den
+    # Breaker schließt; der Feed liegt auf einem anderen Host und hilft nicht
+    if http_client.retry_in(HDENCODE_BASE_URL) > 0:
+        logging.info("Katalog-Backfill pausiert: Circuit Breaker für HDEncode offen")
+        return
+
+    try:
+        store = get_catalog()
+        if store is None:
+            return
+        next_page = int(store.get_meta("backfill_next_page", 1))
+        if next_page > BACKFILL_MAX_PAGE:
+            return
+
+        pages = range(
+            next_page,
+            min(next_page + BACKFILL_PAGES_PER_RUN, BACKFILL_MAX_PAGE + 1)
+        )
+        last_page = {"num": next_page - 1, "end": False}
+
+        def on_page(page_num, posts):
+            if posts is None:
+                return True  # Fehler: beim nächsten Lauf erneut versuchen
+            if not posts:
+                last_page["end"] = True
+                return True
+            last_page["num"] = page_num
+            return False
+
+        crawl_pages(pages, on_page)
+        if last_page["end"]:
+            # Ende des Katalogs erreicht: nicht weiter zurückgehen
+            store.set_meta("backfill_next_page", BACKFILL_MAX_PAGE + 1)
+        else:
+            store.set_meta("backfill_next_page", last_page["num"] + 1)
+        logging.info(
+            f"Katalog-Backfill bis Seite {last_page['num']} "
+            f"({store.count()} Posts)"
+        )
+    except Exception as e:
+        logging.error(f"Fehler beim Katalog-Backfill: {e}")
+
+
+async def run_catalog_backfill():
+    """Füllt den Katalog im Hintergrund auf, bis die Laufzeit beendet wird."""
+    loop = asyncio.get_running_loop()
+    while running.is_set():
+        await loop.run_in_executor(None, backfill_catalog_step)
+        await asyncio.sleep(BACKFILL_INTERVAL)
+
+
+def handle_search(update: Update, context: CallbackContext):
+    if not context.args:
+        update.message.reply_text("🔍 Bitte gib einen Suchbegriff an. Beispiel: /suche inception")
+        return
+
+    query = " ".join(context.args).lower()
+
+    # Zuerst im lokalen Katalog suchen, nur bei Fehlanzeige live abrufen
+    store = get_catalog()
+    posts = store.search(query, feed_only=True) if store is not None else []
+    if not posts:
+        feed_url = get_dynamic_feed_url()
+        posts = [
+            (title, link) for title, link in get_rss_posts(feed_url)
+            if query in title.lower()
+        ]
+
+    matches = []
+    for title, link in posts:
+        matches.append(
+            f"🎬 <b>{html.escape(title)}</b>\n"
+            f"🔗 <a href='{html.escape(link, quote=True)}'>Download</a>"
+        )
+
+    if matches:
+        for msg in matches[:5]:
+            update.message.reply_text(msg, parse_mode='HTML', disable_web_page_preview=True)
+        if len(matches) > 5:
+            update.message.reply_text(f"... {len(matches)-5} weitere Treffer gefunden.")
+    else:
+        update.message.reply_text("❌ Kein Treffer gefunden")
+
+
+PagePost = namedtuple("PagePost", ["title", "link", "published", "category"])
+
+
+def get_http_session():
+    """Gemeinsame Keep-Alive-Session mit Connection-Pool für alle HTTP-Aufrufe."""
+    global http_session
+
+    with http_session_lock:
+        if http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=max(CRAWL_CONCURRENCY, 10),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # urllib3 bietet br an, sobald brotli bzw. brotlicffi installiert ist
+            session.headers.update(make_headers(accept_encoding=True))
+            session.headers["User-Agent"] = HTTP_USER_AGENT
+            session.hooks["response"].append(record_http_response)
+            http_session = session
+        return http_session
+
+
+class Metrics:
+    """
+    Einfache Laufzeitmetriken (Zähler, Gauges, Histogramme) im
+    Prometheus-Textformat, ohne externe Abhängigkeiten.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.setdefault(
+                key, {"buckets": [0] * len(self.BUCKETS), "sum": 0.0, "count": 0, "last": 0.0}
+            )
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+            hist["last"] = value
+
+    @contextmanager
+    def timer(self, stage):
+        """Misst die Dauer einer Stufe als hdencode_stage_seconds{stage=...}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("hdencode_stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def stage_summary(self):
+        """Liefert {stage: (Anzahl, Durchschnitt, Letzter Wert)} für /status."""
+        with self._lock:
+            return {
+                dict(labels)["stage"]: (h["count"], h["sum"] / h["count"], h["last"])
+                for (name, labels), h in self._histograms.items()
+                if name == "hdencode_stage_seconds" and h["count"]
+            }
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        escaped = (
+            (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in items
+        )
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def render(self):
+        """Erzeugt die Metriken im Prometheus-Textformat."""
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({n for n, _ in values}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for (n, labels), value in sorted(values.items()):
+                        if n == name:
+                            lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), hist in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for bound, count in zip(self.BUCKETS, hist["buckets"]):
+                        le = self._format_labels(labels, [("le", bound)])
+                        lines.append(f"{name}_bucket{le} {count}")
+                    inf = self._format_labels(labels, [("le", "+Inf")])
+                    lines.append(f"{name}_bucket{inf} {hist['count']}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {hist['sum']}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class Profiler:
+    """
+    Stichproben-Profiling für Watcher-Zyklen und Bot-Kommandos.
+
+    Ein Anteil `rate` der Abschnitte wird mit cProfile und tracemalloc
+    erfasst; pro Erfassung entstehen in PROFILE_DIR eine .prof-Datei (für
+    pstats/snakeviz) und eine .txt-Zusammenfassung mit den teuersten
+    Funktionen und Allokationen. Es wird immer nur ein Abschnitt zugleich
+    erfasst, die übrigen laufen unverändert weiter; es bleiben die
+    neuesten `keep` Profile erhalten.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, rate=PROFILE_SAMPLE_RATE,
+                 keep=PROFILE_KEEP, top_n=PROFILE_TOP_N):
+        self.directory = directory
+        self.rate = self._parse_rate(rate)
+        self.keep = keep
+        self.top_n = top_n
+        self.captured = 0
+        self.last_summary = None
+        self._active = threading.Lock()
+
+    @staticmethod
+    def _parse_rate(rate):
+        """Rate auf [0, 1] begrenzen; ungültige Werte deaktivieren das Profiling."""
+        try:
+            rate = float(rate)
+        except (TypeError, ValueError):
+            logging.warning(f"Ungültige Profiling-Rate {rate!r} – Profiling deaktiviert")
+            return 0.0
+        if math.isnan(rate):
+            return 0.0
+        return min(max(rate, 0.0), 1.0)
+
+    def set_rate(self, rate):
+        self.rate = self._parse_rate(rate)
+        logging.info(f"Profiling: Stichprobenrate {self.rate:.0%}")
+
+    @contextmanager
+    def section(self, name):
+        """Profiliert den Block mit Wahrscheinlichkeit rate."""
+        if (
+            not self.rate
+            or random.random() >= self.rate
+            or not self._active.acquire(blocking=False)
+        ):
+            yield
+            return
+
+        try:
+            own_tracing = not tracemalloc.is_tracing()
+            if own_tracing:
+                tracemalloc.start()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                duration = time.perf_counter() - start
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if own_tracing:
+                    tracemalloc.stop()
+                self._dump(name, profile, snapshot, peak, duration)
+        finally:
+            self._active.release()
+
+    def _dump(self, name, profile, snapshot, peak, duration):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            base = os.path.join(self.directory, f"{stamp}_{name}")
+            profile.dump_stats(base + ".prof")
+
+            out = StringIO()
+            out.write(f"{name}: {duration * 1000:.1f} ms, Spitzenspeicher {peak / 1024:.0f} KB\n\n")
+            stats = pstats.Stats(profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(self.top_n)
+            out.write("Allokationen (noch belegt, nach Zeile):\n")
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            for stat in snapshot.statistics("lineno")[:self.top_n]:
+                out.write(f"  {stat}\n")
+
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(out.getvalue())
+
+            self.captured += 1
+            self.last_summary = base + ".txt"
+            metrics.inc("hdencode_profiles_total", section=name)
+            self._rotate()
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des Profils: {e}")
+
+    def _rotate(self):
+        stamps = sorted({
+            name.rsplit(".", 1)[0] for name in os.listdir(self.directory)
+            if name.endswith((".prof", ".txt"))
+        })
+        for base in stamps[:-self.keep]:
+            for ext in (".prof", ".txt"):
+                path = os.path.join(self.directory, base + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def describe(self):
+        state = f"{self.rate:.0%} der Zyklen/Kommandos" if self.rate else "aus"
+        return f"🧪 Profiling: {state}, {self.captured} Profile in {self.directory}"
+
+
+profiler = Profiler()
+
+
+def profiled(handler):
+    """Bot-Kommando mit Stichproben-Profiling umhüllen."""
+    @functools.wraps(handler)
+    def wrapper(update, context):
+        with profiler.section(handler.__name__):
+            return handler(update, context)
+    return wrapper
+
+
+def record_http_response(response, *args, **kwargs):
+    """Response-Hook der gemeinsamen Session: zählt Statuscodes und Bytes."""
+    host = urlparse(response.url).netloc
+    metrics.inc("hdencode_http_responses_total", host=host, status=response.status_code)
+    if not kwargs.get("stream"):
+        metrics.inc("hdencode_bytes_downloaded_total", len(response.content), host=host)
+    return response
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Liefert /metrics für Prometheus aus."""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics-Endpunkt: {format % args}")
+
+
+def start_metrics_server():
+    """Startet den lokalen Metrics-Endpunkt; None, wenn deaktiviert oder fehlgeschlagen."""
+    if not METRICS_PORT:
+        return None
+    try:
+        server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), MetricsRequestHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Metrics unter http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        return server
+    except Exception as e:
+        logging.error(f"Metrics-Endpunkt konnte nicht gestartet werden: {e}")
+        return None
+
+
+class HostLimiter:
+    """Höflichkeitslimit pro Host: maximale Parallelität und Mindestabstand."""
+
+    def __init__(self, max_parallel=CRAWL_HOST_LIMIT, min_delay=CRAWL_HOST_DELAY):
+        self.max_parallel = max_parallel
+        self.min_delay = min_delay
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+
+    @contextmanager
+    def slot(self, url, spaced=True):
+        """
+        Belegt einen der max_parallel Plätze des Hosts. Mit spaced wird
+        zusätzlich min_delay seit der letzten Anfrage mit Abstand gewartet.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                host, threading.BoundedSemaphore(self.max_parallel)
+            )
+
+        with semaphore:
+            if spaced:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_slot.get(host, now))
+                    self._next_slot[host] = start + self.min_delay
+                if start > now:
+                    time.sleep(start - now)
+            yield
+
+
+host_limiter = HostLimiter()
+
+
+class CircuitOpenError(requests.RequestException):
+    """Anfrage nicht gesendet, weil der Circuit Breaker des Hosts offen ist."""
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker für einen Host: Nach failure_threshold fehlgeschlagenen
+    Anfragen in Folge bleibt er reset_timeout Sekunden offen. Danach darf
+    eine einzelne Testanfrage durch (halb offen); gelingt sie, schließt er
+    wieder, sonst beginnt die Pause von vorn.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def remaining(self):
+        """Sekunden bis zur nächsten Testanfrage (0, wenn geschlossen)."""
+        with self._lock:
+            if self.opened_at is None:
+                return 0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        """Liefert True, wenn der Breaker dadurch geschlossen wurde."""
+        with self._lock:
+            was_open = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+            return was_open
+
+    def record_failure(self):
+        """Liefert True, wenn der Breaker dadurch geöffnet wurde."""
+        with self._lock:
+            was_open = self.opened_at is not None
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+            return self.opened_at is not None and not was_open
+
+
+def is_cloudflare_challenge(response):
+    """Cloudflare-Abfrageseite statt Inhalt (Bot-Schutz, "Under Attack"-Modus)."""
+    if response.headers.get("cf-mitigated") == "challenge":
+        return True
+    return (
+        response.status_code in (403, 503)
+        and response.headers.get("Server", "").lower() == "cloudflare"
+    )
+
+
+class HttpClient:
+    """
+    Gemeinsamer HTTP-Client für alle Netzwerkzugriffe des Watchers.
+
+    Nutzt die Keep-Alive-Session aus get_http_session() und das Host-Limit
+    des HostLimiter. GET-Anfragen werden bei Verbindungsfehlern, 429 und
+    5xx mit exponentiellem Backoff und Jitter wiederholt (Retry-After wird
+    beachtet). Pro Host zählt ein CircuitBreaker fehlgeschlagene Anfragen;
+    ist er offen, scheitern Anfragen sofort mit CircuitOpenError und die
+    Aufrufer greifen auf zwischengespeicherte Daten zurück.
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, limiter=host_limiter, retries=HTTP_RETRIES,
+                 backoff_base=HTTP_BACKOFF_BASE, backoff_max=HTTP_BACKOFF_MAX,
+                 failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url):
+        """CircuitBreaker des Hosts einer URL."""
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def is_open(self, url):
+        return self.breaker(url).is_open
+
+    def retry_in(self, url):
+        """Sekunden, bis der Host wieder (als Testanfrage) abgerufen werden darf; 0 = sofort."""
+        return self.breaker(url).remaining()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        # POST wird nicht wiederholt (keine doppelten Nachrichten); Telegram
+        # regelt Wiederholungen und 429 selbst in der NotificationQueue
+        kwargs.setdefault("retries", 0)
+        kwargs.setdefault("circuit", False)
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, retries=None, circuit=True, spaced=False, **kwargs):
+        """
+        Sendet die Anfrage und liefert die letzte Antwort; Fehlerstatus
+        bleiben für raise_for_status() erhalten. Verbindungsfehler nach der
+        letzten Wiederholung werden weitergereicht. spaced=True hält
+        zusätzlich den Mindestabstand des HostLimiter ein (Seiten-Crawls).
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker(url) if circuit else None
+        if breaker is not None and not breaker.allow():
+            metrics.inc("hdencode_http_short_circuited_total", host=host)
+            raise CircuitOpenError(f"Circuit Breaker für {host} offen")
+
+        retries = self.retries if retries is None else retries
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        resolved = False
+
+        try:
+            for attempt in range(retries + 1):
+                response = error = None
+                try:
+                    with self.limiter.slot(url, spaced):
+                        response = get_http_session().request(method, url, **kwargs)
+                except requests.RequestException as e:
+                    error = e
+
+                if error is None and not self._is_failure(response):
+                    resolved = True
+                    if breaker is not None and breaker.record_success():
+                        logging.info(f"🔌 Circuit Breaker für {host} wieder geschlossen")
+                        metrics.set_gauge("hdencode_circuit_open", 0, host=host)
+                    return response
+
+                retryable = (
+                    isinstance(error, (requests.ConnectionError, requests.Timeout))
+                    or (response is not None and response.status_code in self.RETRY_STATUS
+                        and not is_cloudflare_challenge(response))
+                )
+                if attempt == retries or not retryable:
+                    break
+
+                delay = self._retry_delay(attempt, response)
+                reason = error or f"HTTP {response.status_code}"
+                if response is not None:
+                    response.close()
+                metrics.inc("hdencode_http_retries_total", host=host)
+                logging.warning(
+                    f"{method} {url} fehlgeschlagen ({reason}), "
+                    f"Versuch {attempt + 2}/{retries + 1} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+        finally:
+            # Auch unerwartete Ausnahmen zählen als Fehlschlag, sonst bliebe
+            # eine Testanfrage offen und der Breaker dauerhaft halb offen
+            if breaker is not None and not resolved and breaker.record_failure():
+                logging.warning(
+                    f"🔌 Circuit Breaker für {host} geöffnet ({breaker.failures} Fehler in Folge), "
+                    f"Pause {breaker.reset_timeout}s – verwende zwischengespeicherte Daten"
+                )
+                metrics.set_gauge("hdencode_circuit_open", 1, host=host)
+
+        if error is not None:
+            raise error
+        return response
+
+    def _is_failure(self, response):
+        return response.status_code in self.RETRY_STATUS or is_cloudflare_challenge(response)
+
+    def _retry_delay(self, attempt, response):
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        backoff = min(self.backoff_base * 2 ** attempt, self.backoff_max)
+        return random.uniform(backoff / 2, backoff)
+
+    def describe(self):
+        """Offene Circuit Breaker für /status (leer, wenn alle geschlossen sind)."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return "\n".join(
+            f"🔌 Circuit Breaker offen: {host} (Testabruf in {breaker.remaining():.0f}s)"
+            for host, breaker in breakers if breaker.is_open
+        )
+
+
+http_client = HttpClient()
+
+
+class _FeedLinkFinder(HTMLParser):
+    """
+    Sucht im ganzen Dokument nach dem ersten <link type="application/rss+xml">
+    (wie zuvor soup.find) und bricht dort ab; auf WordPress-Seiten steht er
+    im <head>, der Rest der Seite wird dann nicht mehr gelesen.
+    """
+
+    class Done(Exception):
+        pass
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "link":
+            attrs = dict(attrs)
+            if attrs.get("type") == "application/rss+xml":
+                self.href = attrs.get("href") or None
+                raise self.Done()
+
+    handle_startendtag = handle_starttag
+
+
+def extract_feed_link(markup):
+    """Liefert die href des ersten RSS-<link> der Seite oder None."""
+    finder = _FeedLinkFinder()
+    try:
+        finder.feed(markup)
+    except _FeedLinkFinder.Done:
+        pass
+    return finder.href
+
+
+def _new_page_post(title_tag_text, href):
+    return {"title": title_tag_text.strip(), "link": href, "published": None, "category": None}
+
+
+@functools.lru_cache(maxsize=None)
+def load_lxml_html():
+    """Importiert lxml.html beim ersten Gebrauch (optional, schnellerer HTML-Parser); sonst None."""
+    try:
+        from lxml import html as lxml_html
+    except ImportError:
+        return None
+    return lxml_html
+
+
+def _extract_page_posts_lxml(markup):
+    """Extraktion mit lxml (C-Parser), ohne BeautifulSoup-Baum."""
+    doc = load_lxml_html().fromstring(markup)
+    posts = []
+    current = None
+    title_links = set()
+
+    # iter() liefert die Elemente in Dokumentreihenfolge
+    for el in doc.iter("h2", "time", "a"):
+        if el.tag == "h2":
+            if "title" not in (el.get("class") or "").split():
+                continue
+            links = list(el.iter("a"))
+            title_links.update(links)
+            current = None
+            if links and links[0].get("href"):
+                current = _new_page_post(links[0].text_content(), links[0].get("href"))
+                posts.append(current)
+        elif current is None or el in title_links:
+            continue
+        elif el.tag == "time" and current["published"] is None:
+            current["published"] = _parse_feed_date(el.get("datetime") or el.text_content())
+        elif el.tag == "a" and current["category"] is None:
+            if "category" in (el.get("rel") or "").split():
+                current["category"] = el.text_content().strip()
+
+    return posts
+
+
+def _extract_page_posts_bs4(markup):
+    """Extraktion mit BeautifulSoup, das nur die relevanten Tags aufbaut."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer(["h2", "time", "a"])
+    soup = BeautifulSoup(markup, "html.parser", parse_only=strainer)
+    posts = []
+    current = None
+    title_links = set()
+
+    # Wie lxml iter(): alle Elemente in Dokumentreihenfolge, auch verschachtelte
+    # wie <span class="posted-on"><a rel="bookmark"><time ...></a></span>
+    for el in soup.find_all(["h2", "time", "a"]):
+        if el.name == "h2":
+            if "title" not in (el.get("class") or []):
+                continue
+            links = el.find_all("a")
+            title_links.update(id(link) for link in links)
+            current = None
+            if links and links[0].get("href"):
+                current = _new_page_post(links[0].get_text(), links[0]["href"])
+                posts.append(current)
+        elif current is None or id(el) in title_links:
+            continue
+        elif el.name == "time" and current["published"] is None:
+            current["published"] = _parse_feed_date(el.get("datetime") or el.get_text())
+        elif el.name == "a" and current["category"] is None:
+            if "category" in (el.get("rel") or []):
+                current["category"] = el.get_text().strip()
+
+    return posts
+
+
+PAGE_EXTRACTORS = {
+    "lxml": _extract_page_posts_lxml,
+    "bs4": _extract_page_posts_bs4,
+}
+
+
+def extract_page_posts(markup, extractor=None):
+    """
+    Extrahiert Titel, Link, Datum und Kategorie aller Posts einer
+    Übersichtsseite in einem Durchlauf. Ohne Angabe wird HTML_EXTRACTOR
+    verwendet; "auto" wählt lxml, falls installiert.
+    """
+    name = extractor or HTML_EXTRACTOR
+    if name == "auto":
+        name = "lxml" if load_lxml_html() is not None else "bs4"
+
+    return [
+        PagePost(post["title"], post["link"], post["published"], post["category"])
+        for post in PAGE_EXTRACTORS[name](markup)
+    ]
+
+
+def fetch_page_posts(page_num):
+    """Lädt eine Übersichtsseite von HDEncode und liefert deren Posts."""
+    url = f"{HDENCODE_BASE_URL}/page/{page_num}/"
+
+    with metrics.timer("fetch_page"):
+        # Abstand zwischen Anfragen nur beim Seiten-Crawl, Einzelabrufe laufen sofort
+        resp = http_client.get(url, timeout=CRAWL_TIMEOUT, spaced=True)
+    resp.raise_for_status()
+    posts = extract_page_posts(resp.text)
+    add_to_catalog(posts)
+    return posts
+
+
+def get_page_posts(page_num):
+    """
+    Wie fetch_page_posts, aber für PAGE_CACHE_TTL gecacht (gleichzeitige
+    Abrufe zusammengelegt). Bei offenem Circuit Breaker wird eine bereits
+    geladene Seite auch nach Ablauf der TTL geliefert.
+    """
+    key = ("page", page_num)
+    try:
+        return http_cache.get(key, lambda: fetch_page_posts(page_num), PAGE_CACHE_TTL)
+    except CircuitOpenError:
+        posts = http_cache.peek(key)
+        if posts is None:
+            raise
+        return posts
+
+
+def crawl_pages(page_numbers, on_page, concurrency=CRAWL_CONCURRENCY,
+                deadline=CRAWL_DEADLINE, fetch=fetch_page_posts, cancel=None):
+    """
+    Lädt Übersichtsseiten parallel (höchstens `concurrency` gleichzeitig).
+
+    on_page(page_num, posts) wird in Seitenreihenfolge aufgerufen (posts ist
+    None, wenn die Seite nicht geladen werden konnte); liefert es True,
+    werden keine weiteren Seiten mehr angefordert. Nach `deadline`
+    Sekunden wird mit den bis dahin geladenen Seiten abgebrochen. `fetch`
+    lädt eine Seite (Standard: immer frisch, get_page_posts: gecacht).
+    Ist `cancel` gesetzt, wird keine weitere Seite angefordert und nicht auf
+    laufende Abrufe gewartet.
+    """
+    page_numbers = list(page_numbers)
+    end_time = time.monotonic() + deadline
+    results = {}
+    pending = {}
+    next_index = 0
+    deliver_index = 0
+    stopped = False
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        def submit_more():
+            nonlocal next_index
+            while (
+                not stopped
+                and not (cancel is not None and cancel.is_set())
+                and next_index < len(page_numbers)
+                and len(pending) < concurrency
+            ):
+                page_num = page_numbers[next_index]
+                pending[executor.submit(fetch, page_num)] = page_num
+                next_index += 1
+
+        submit_more()
+
+        while pending and not stopped:
+            if cancel is not None and cancel.is_set():
+                break
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                logging.warning("Seiten-Crawl: Zeitlimit erreicht, breche ab")
+                break
+
+            # Mit Abbruch-Event regelmäßig aufwachen, statt auf langsame Seiten zu warten
+            timeout = remaining if cancel is None else min(remaining, 0.5)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_num = pending.pop(future)
+                try:
+                    results[page_num] = future.result()
+                except Exception as e:
+                    logging.warning(f"Fehler bei Seite {page_num}: {e}")
+                    results[page_num] = None
+
+            # Ergebnisse in Seitenreihenfolge ausliefern
+            while (
+                not stopped
+                and deliver_index < len(page_numbers)
+                and page_numbers[deliver_index] in results
+            ):
+                page_num = page_numbers[deliver_index]
+                deliver_index += 1
+                if on_page(page_num, results[page_num]):
+                    stopped = True
+
+            submit_more()
+    finally:
+        # Nicht auf laufende Abrufe warten (Zeitlimit/Abbruch)
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    return results
+
+
+def search_hdencode_pages(query, max_pages=10, max_results=None, older_than=None,
+                          on_progress=None, cancel=None):
+    """
+    Durchsucht mehrere Seiten der HDEncode-Webseite nach Titeln, die den Suchbegriff enthalten.
+
+    Die Seiten werden parallel geladen und für PAGE_CACHE_TTL gecacht, sodass
+    Folgesuchen die bereits geladenen Seiten nur noch filtern. Die Suche endet
+    vorzeitig, sobald `max_results` Treffer vorliegen, alle Posts einer Seite
+    älter als `older_than` (Unix-Zeit) sind oder `cancel` gesetzt wird.
+    on_progress(Seiten, Treffer) wird nach jeder Seite aufgerufen.
+    """
+    query = query.lower()
+    results = []
+    pages_done = 0
+
+    def on_page(page_num, posts):
+        nonlocal pages_done
+        posts = posts or []
+        pages_done += 1
+        for post in posts:
+            if query in post.title.lower():
+                results.append((post.title, post.link))
+
+        if on_progress is not None:
+            on_progress(pages_done, results)
+        if cancel is not None and cancel.is_set():
+            return True
+        if max_results and len(results) >= max_results:
+            return True
+        return is_page_older_than(posts, older_than)
+
+    crawl_pages(range(1, max_pages + 1), on_page, fetch=get_page_posts, cancel=cancel)
+
+    return results[:max_results] if max_results else results
+
+
+def is_page_older_than(posts, older_than):
+    """True, wenn alle Posts einer Seite älter als older_than (Unix-Zeit) sind."""
+    return bool(older_than and posts) and all(
+        post.published is not None and post.published < older_than
+        for post in posts
+    )
+
+
+def catch_up_missed_posts(since, known_links=(), max_pages=CATCHUP_MAX_PAGES,
+                          deadline=CATCHUP_DEADLINE):
+    """
+    Holt Posts nach, die nach einem Ausfall aus dem RSS-Feed gerutscht sind.
+
+    Lädt die Übersichtsseiten parallel, bis eine Seite nur noch Posts vor
+    `since` (Unix-Zeit des letzten verarbeiteten Posts) enthält oder das
+    Zeitbudget erschöpft ist. Liefert FeedEntry-Objekte (neueste zuerst);
+    Posts ohne Datum werden nicht nachgeholt.
+    """
+    known_links = set(known_links)
+    recovered = []
+    pages = []
+
+    def on_page(page_num, posts):
+        posts = posts or []
+        pages.append(page_num)
+        for post in posts:
+            if post.published is None or post.published < since or post.link in known_links:
+                continue
+            known_links.add(post.link)
+            recovered.append(FeedEntry(post.title, post.link, post.link, post.published))
+        return is_page_older_than(posts, since)
+
+    with metrics.timer("catch_up"):
+        crawl_pages(range(1, max_pages + 1), on_page, deadline=deadline)
+
+    logging.info(
+        f"⏪ Nachgeholt: {len(recovered)} Posts aus {len(pages)} Seiten "
+        f"(seit {datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M')})"
+    )
+    metrics.inc("hdencode_catchup_posts_total", len(recovered))
+    return recovered
+
+
+def format_search_results(results, limit=10):
+    """Trefferliste für eine Statusnachricht (HTML)."""
+    lines = [
+        f"🎬 <a href='{html.escape(link, quote=True)}'>{html.escape(title)}</a>"
+        for title, link in results[:limit]
+    ]
+    if len(results) > limit:
+        lines.append(f"... {len(results) - limit} weitere Treffer")
+    return "\n".join(lines)
+
+
+def handle_search_all(update: Update, context: CallbackContext):
+    if not context.args:
+        update.message.reply_text("🔍 Bitte gib einen Suchbegriff an. Beispiel: /suchealle dune")
+        return
+
+    query = " ".join(context.args).strip()
+    status = update.message.reply_text(f"🔎 Suche nach '{query}' im gesamten HDEncode-Katalog...")
+
+    store = get_catalog()
+    results = store.search(query) if store is not None else []
+    if results:
+        status.edit_text(
+            f"✅ {len(results)} Treffer für '{html.escape(query)}' im Katalog\n"
+            + format_search_results(results),
+            parse_mode='HTML', disable_web_page_preview=True,
+        )
+        return
+
+    max_pages = 25
+    chat_id = update.effective_chat.id
+    cancel = threading.Event()
+    with active_searches_lock:
+        previous = active_searches.get(chat_id)
+        if previous is not None:
+            previous.set()  # Neue Suche ersetzt die laufende
+        active_searches[chat_id] = cancel
+
+    last_edit = 0
+    last_text = None
+
+    def show(text):
+        nonlocal last_text
+        if text == last_text:
+            return
+        try:
+            status.edit_text(text, parse_mode='HTML', disable_web_page_preview=True)
+            last_text = text
+        except Exception as e:
+            logging.debug(f"Statusnachricht nicht aktualisiert: {e}")
+
+    def on_progress(pages_done, hits):
+        nonlocal last_edit
+        # Telegram begrenzt Bearbeitungen: höchstens alle SEARCH_EDIT_INTERVAL Sekunden
+        if time.monotonic() - last_edit < SEARCH_EDIT_INTERVAL:
+            return
+        last_edit = time.monotonic()
+        show(
+            f"🔎 Suche nach '{html.escape(query)}': Seite {pages_done}/{max_pages}, "
+            f"{len(hits)} Treffer (/abbrechen)\n" + format_search_results(hits)
+        )
+
+    try:
+        results = search_hdencode_pages(
+            query, max_pages=max_pages, on_progress=on_progress, cancel=cancel
+        )
+    finally:
+        with active_searches_lock:
+            if active_searches.get(chat_id) is cancel:
+                del active_searches[chat_id]
+
+    if cancel.is_set():
+        headline = f"⏹️ Suche nach '{html.escape(query)}' abgebrochen: {len(results)} Treffer"
+    elif results:
+        headline = f"✅ {len(results)} Treffer für '{html.escape(query)}'"
+    else:
+        headline = "❌ Kein Treffer gefunden"
+    show(headline + ("\n" + format_search_results(results) if results else ""))
+
+
+def handle_cancel(update: Update, context: CallbackContext):
+    """Bricht die laufende /suchealle des Chats ab."""
+    with active_searches_lock:
+        cancel = active_searches.get(update.effective_chat.id)
+    if cancel is None:
+        update.message.reply_text("Keine laufende Suche.")
+        return
+    cancel.set()
+    update.message.reply_text("⏹️ Suche wird abgebrochen...")
+
+def handle_status(update: Update, context: CallbackContext):
+    status = "🟢 Läuft" if running.is_set() else "🔴 Gestoppt"
+    last_check = (
+        last_check_time.strftime('%Y-%m-%d %H:%M:%S') if last_check_time else "Nie"
+    )
+    lines = [
+        status,
+        f"🕒 Letzter Check: {last_check}",
+        poll_scheduler.describe(),
+        f"📦 Posts: {metrics.counter('hdencode_posts_fetched_total')} abgerufen, "
+        f"{metrics.counter('hdencode_new_posts_total')} neu, "
+        f"{metrics.counter('hdencode_matches_total')} Matches",
+        f"📨 Warteschlange: {len(notification_queue)} Nachrichten",
+    ]
+    if subscribers is not None:
+        lines.append(subscribers.describe())
+    if profiler.rate:
+        lines.append(profiler.describe())
+    if seen_store is not None:
+        lines.append(f"👁️ Gesehene Links: {len(seen_store)}")
+    breakers = http_client.describe()
+    if breakers:
+        lines.append(breakers)
+
+    stages = metrics.stage_summary()
+    if stages:
+        lines.append("⏱️ Stufen (Anzahl / Ø / zuletzt):")
+        for stage, (count, avg, last) in sorted(stages.items()):
+            lines.append(f"  {stage}: {count} / {avg * 1000:.0f} ms / {last * 1000:.0f} ms")
+
+    update.message.reply_text("\n".join(lines))
+
+def handle_profile(update: Update, context: CallbackContext):
+    """/profile [an|aus|<Rate>|letzte] – Profiling steuern (nur im Admin-Chat)."""
+    if str(update.effective_chat.id) != str(TELEGRAM_CHAT_ID):
+        update.message.reply_text("⛔ Nur im Admin-Chat verfügbar.")
+        return
+
+    arg = context.args[0].lower() if context.args else ""
+    if arg in ("an", "on"):
+        profiler.set_rate(1.0)
+    elif arg in ("aus", "off"):
+        profiler.set_rate(0.0)
+    elif arg in ("letzte", "last"):
+        if not profiler.last_summary or not os.path.exists(profiler.last_summary):
+            update.message.reply_text("Noch kein Profil vorhanden.")
+            return
+        with open(profiler.last_summary, "r", encoding="utf-8") as f:
+            update.message.reply_text(f.read()[:TELEGRAM_MAX_LENGTH])
+        return
+    elif arg:
+        try:
+            profiler.set_rate(float(arg.rstrip("%")) / (100 if arg.endswith("%") else 1))
+        except ValueError:
+            update.message.reply_text("Verwendung: /profile [an|aus|0.05|5%|letzte]")
+            return
+
+    update.message.reply_text(profiler.describe())
+
+
+def start_telegram_bot():
+    """Startet den Telegram-Bot mit Befehlshandlern und liefert den Updater."""
+    from telegram.ext import Updater, CommandHandler
+
+    updater = Updater(
+        TELEGRAM_TOKEN, use_context=True, workers=BOT_WORKERS,
+        base_url=f"{TELEGRAM_API_URL}/bot",
+    )
+    dp = updater.dispatcher
+    # run_async: Kommandos laufen parallel im Worker-Pool des Dispatchers
+    dp.add_handler(CommandHandler("suche", profiled(handle_search), run_async=True))
+    dp.add_handler(CommandHandler("status", profiled(handle_status), run_async=True))
+    dp.add_handler(CommandHandler("suchealle", profiled(handle_search_all), run_async=True))
+    dp.add_handler(CommandHandler("abbrechen", handle_cancel, run_async=True))
+    dp.add_handler(CommandHandler("profile", handle_profile, run_async=True))
+    updater.start_polling(drop_pending_updates=True)
+    logging.info("Telegram-Bot läuft und wartet auf Kommandos.")
+    return updater
+
+
+async def run_telegram_bot():
+    """Betreibt den Telegram-Bot, bis der Task abgebrochen wird."""
+    loop = asyncio.get_running_loop()
+    try:
+        updater = await loop.run_in_executor(None, start_telegram_bot)
+    except Exception as e:
+        logging.error(f"Telegram-Bot konnte nicht gestartet werden: {e}")
+        return
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await loop.run_in_executor(None, updater.stop)
+
+
+FeedEntry = namedtuple("FeedEntry", ["title", "link", "guid", "published"])
+
+
+def parse_feed_entries(text):
+    """Parst den kompletten Feed mit feedparser (Fallback für fehlerhafte Feeds)."""
+    import feedparser
+
+    with metrics.timer("feedparser_parse"):
+        feed = feedparser.parse(text)
+
+    if hasattr(feed, 'bozo') and feed.bozo:
+        logging.warning(
+            f"RSS-Feed hat Parsing-Probleme: {feed.bozo_exception}"
+        )
+
+    entries = []
+    for entry in feed.entries:
+        if hasattr(entry, 'title') and hasattr(entry, 'link'):
+            link = entry.link.strip()
+            published = entry.get('published_parsed')
+            entries.append(FeedEntry(
+                entry.title.strip(),
+                link,
+                (entry.get('id') or link).strip(),
+                calendar.timegm(published) if published else None,
+            ))
+
+    return entries
+
+
+def _local_tag(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _parse_feed_date(text):
+    """Wandelt pubDate (RFC 822) oder Atom-Datum (ISO 8601) in Unix-Zeit um."""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        return calendar.timegm(parsed.timetuple())
+    return parsed.timestamp()
+
+
+def _feed_entry_from_element(elem):
+    """Baut einen FeedEntry aus einem <item>- (RSS) oder <entry>-Element (Atom)."""
+    fields = {}
+    link = None
+    for child in elem:
+        tag = _local_tag(child.tag)
+        if tag == "link":
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                link = link or href
+            elif child.text and child.text.strip():
+                link = link or child.text
+        elif tag not in fields:
+            fields[tag] = child.text or ""
+
+    title = fields.get("title")
+    if title is None or not link:
+        return None
+
+    link = link.strip()
+    guid = (fields.get("guid") or fields.get("id") or link).strip()
+    published = _parse_feed_date(
+        fields.get("pubDate") or fields.get("published")
+        or fields.get("updated") or fields.get("date")
+    )
+    return FeedEntry(html.unescape(title).strip(), link, guid, published)
+
+
+def iter_feed_entries(chunks):
+    """
+    Liest einen RSS-/Atom-Feed inkrementell aus Byte-Blöcken und liefert
+    FeedEntry-Tupel, sobald ein Eintrag vollständig ist. Verarbeitete
+    Elemente werden sofort verworfen, der Aufrufer kann jederzeit
+    abbrechen. Bei fehlerhaftem XML wird auf feedparser zurückgegriffen,
+    solange der bisherige Inhalt in FEED_STREAM_BUFFER_LIMIT passt.
+    """
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    chunks = iter(chunks)
+    buffered = []
+    buffered_size = 0
+    yielded = set()
+    parents = []
+
+    def drain():
+        for event, elem in parser.read_events():
+            tag = _local_tag(elem.tag)
+            if event == "start":
+                parents.append(elem)
+                continue
+
+            parents.pop()
+            if tag in ("item", "entry"):
+                entry = _feed_entry_from_element(elem)
+                # Element aus dem Baum lösen, damit der Speicher flach bleibt
+                if parents:
+                    parents[-1].remove(elem)
+                else:
+                    elem.clear()
+                if entry is not None:
+                    yield entry
+
+    try:
+        for chunk in chunks:
+            if buffered is not None:
+                buffered.append(chunk)
+                buffered_size += len(chunk)
+                if buffered_size > FEED_STREAM_BUFFER_LIMIT:
+                    buffered = None
+            parser.feed(chunk)
+            for entry in drain():
+                yielded.add(entry.guid)
+                yield entry
+
+        parser.close()
+        for entry in drain():
+            yield entry
+
+    except ElementTree.ParseError as e:
+        if buffered is None:
+            logging.warning(f"RSS-Feed hat Parsing-Probleme: {e}")
+            return
+
+        logging.warning(f"RSS-Feed hat Parsing-Probleme: {e} – verwende feedparser")
+        body = b"".join(buffered) + b"".join(chunks)
+        for entry in parse_feed_entries(body):
+            if entry.guid not in yielded:
+                yield entry
+
+
+def iter_response_chunks(response):
+    """Liefert den Body einer Streaming-Antwort blockweise und zählt die Bytes."""
+    host = urlparse(response.url).netloc
+    for chunk in response.iter_content(chunk_size=FEED_CHUNK_SIZE):
+        metrics.inc("hdencode_bytes_downloaded_total", len(chunk), host=host)
+        yield chunk
+
+
+def fetch_rss_posts(feed_url):
+    """Ruft RSS-Feed-Einträge live ab; None bei Fehlern."""
+    try:
+        with metrics.timer("get_rss_posts"):
+            response = http_client.get(feed_url, timeout=15, stream=True)
+            with response:
+                response.raise_for_status()
+                entries = list(iter_feed_entries(iter_response_chunks(response)))
+
+        add_to_catalog(((e.title, e.link, e.published) for e in entries), feed=True)
+        return [(entry.title, entry.link) for entry in entries]
+
+    except CircuitOpenError as e:
+        logging.warning(f"RSS-Feed-Abruf übersprungen: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"RSS-Feed Fehler: {e}")
+        return None
+
+
+def get_rss_posts(feed_url):
+    """
+    Ruft RSS-Feed-Einträge ab (gecacht für FEED_CACHE_TTL). Ist der Feed
+    nicht erreichbar, wird der zuletzt geladene Stand geliefert.
+    """
+    posts = http_cache.get(
+        ("feed", feed_url), lambda: fetch_rss_posts(feed_url), FEED_CACHE_TTL
+    )
+    if posts is None:
+        posts = http_cache.peek(("feed", feed_url))
+        if posts:
+            logging.info("RSS-Feed nicht erreichbar – verwende zwischengespeicherten Stand")
+    return posts or []
+
+
+class FeedFetcher:
+    """
+    Bedingter und inkrementeller Abruf des RSS-Feeds.
+
+    Merkt sich ETag/Last-Modified für 304-Antworten sowie GUIDs und
+    Veröffentlichungszeit der zuletzt verarbeiteten Einträge, damit pro
+    Zyklus nur neue Einträge gematcht werden. Der Zustand wird erst mit
+    mark_processed() übernommen und in FEED_STATE_FILE gespeichert.
+    """
+
+    MAX_KNOWN_GUIDS = 500
+
+    def __init__(self, feed_url, state_path=FEED_STATE_FILE):
+        self.feed_url = feed_url
+        self.state_path = state_path
+        self.etag = None
+        self.last_modified = None
+        self.last_published = None
+        self.known_guids = []
+        self.last_entries = []
+        self.parsed_count = 0
+        self.gap_since = None  # Zeit des letzten verarbeiteten Posts, falls der Feed ihn nicht mehr enthält
+        self._pending_validators = None
+        self._load_state()
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des Feed-Zustands: {e}")
+            return
+
+        # Validatoren gelten nur für die URL, zu der sie gehören
+        if state.get("feed_url") == self.feed_url:
+            self.etag = state.get("etag")
+            self.last_modified = state.get("last_modified")
+        self.last_published = state.get("last_published")
+        self.known_guids = state.get("known_guids", [])
+
+    @staticmethod
+    def saved_feed_url(state_path=FEED_STATE_FILE):
+        """Feed-URL aus dem gespeicherten Zustand oder None."""
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                feed_url = json.load(f).get("feed_url")
+        except (OSError, ValueError):
+            return None
+        # Der Fallback-Feed ist nur eine Notlösung, dann lieber neu ermitteln
+        return feed_url if feed_url != FALLBACK_FEED_URL else None
+
+    def switch_url(self, feed_url):
+        """Wechselt die Feed-URL; ETag/Last-Modified der alten URL verfallen."""
+        if feed_url == self.feed_url:
+            return False
+
+        logging.info(f"Feed-URL geändert: {self.feed_url} → {feed_url}")
+        self.feed_url = feed_url
+        self.etag = None
+        self.last_modified = None
+        return True
+
+    def _save_state(self):
+        state = {
+            "feed_url": self.feed_url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "last_published": self.last_published,
+            "known_guids": self.known_guids,
+        }
+        try:
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des Feed-Zustands: {e}")
+
+    def fetch_new(self):
+        """
+        Liefert die noch nicht verarbeiteten Einträge (neueste zuerst),
+        eine leere Liste bei 304/ohne Neuigkeiten oder None bei Fehlern.
+        """
+        # Ohne bekanntes Feed-Fenster (erster Abruf nach dem Start) wird der
+        # ganze Feed gelesen; ein 304 würde last_entries leer lassen
+        read_all = not self.last_entries
+        headers = {}
+        if self.etag and not read_all:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified and not read_all:
+            headers["If-Modified-Since"] = self.last_modified
+
+        self.gap_since = None
+        try:
+            with metrics.timer("get_rss_posts"):
+                response = http_client.get(
+                    self.feed_url, headers=headers, timeout=15, stream=True
+                )
+                with response:
+                    if response.status_code == 304:
+                        logging.info("RSS-Feed unverändert (304)")
+                        http_cache.touch(("feed", self.feed_url))
+                        self.parsed_count = 0
+                        return []
+                    response.raise_for_status()
+
+                    self._pending_validators = (
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+                    new_entries, older_entries = self._read_new_entries(
+                        iter_response_chunks(response), read_all
+                    )
+
+        except CircuitOpenError as e:
+            logging.warning(f"RSS-Feed-Abruf übersprungen: {e}")
+            return None
+        except Exception as e:
+            logging.error(f"RSS-Feed Fehler: {e}")
+            return None
+
+        if read_all:
+            self.last_entries = new_entries + older_entries
+        else:
+            # Fenster der zuletzt bekannten Feed-Einträge fortschreiben
+            window = max(len(self.last_entries), len(new_entries))
+            self.last_entries = (new_entries + self.last_entries)[:window]
+        # /suche findet nur, was im aktuellen Fenster steht
+        add_to_catalog(((e.title, e.link, e.published) for e in self.last_entries), feed=True)
+        # Bot-Kommandos nutzen denselben, frisch geladenen Feed
+        http_cache.set(
+            ("feed", self.feed_url), [(e.title, e.link) for e in self.last_entries]
+        )
+
+        return new_entries
+
+    def _read_new_entries(self, chunks, read_all=False):
+        """
+        Liest den Feed nur bis zum ersten bereits verarbeiteten Eintrag.
+        Mit read_all wird der Rest trotzdem gelesen. Liefert
+        (neue Einträge, bereits verarbeitete Einträge).
+        """
+        known = set(self.known_guids)
+        new_entries = []
+        older_entries = []
+        reached_known = False
+        self.parsed_count = 0
+
+        for entry in iter_feed_entries(chunks):
+            self.parsed_count += 1
+            # Der Feed ist absteigend sortiert: ab dem ersten bekannten
+            # oder älteren Eintrag ist alles Weitere bereits verarbeitet
+            if not reached_known and (
+                entry.guid in known
+                or (
+                    self.last_published is not None
+                    and entry.published is not None
+                    and entry.published < self.last_published
+                )
+            ):
+                reached_known = True
+                if not read_all:
+                    break
+            if reached_known:
+                older_entries.append(entry)
+            else:
+                new_entries.append(entry)
+
+        # Kein bekannter Eintrag mehr im Feed: dazwischen liegende Posts fehlen
+        if not reached_known and new_entries and self.last_published is not None:
+            self.gap_since = self.last_published
+
+        return new_entries, older_entries
+
+    def mark_processed(self, entries):
+        """Übernimmt Validatoren und die verarbeiteten Einträge in den Zustand."""
+        if self._pending_validators:
+            self.etag, self.last_modified = self._pending_validators
+            self._pending_validators = None
+
+        if entries:
+            self.known_guids = (
+                [entry.guid for entry in entries] + self.known_guids
+            )[:self.MAX_KNOWN_GUIDS]
+            timestamps = [e.published for e in entries if e.published is not None]
+            if timestamps:
+                self.last_published = max(timestamps + [self.last_published or 0])
+
+        self._save_state()
+
+
+Release = namedtuple("Release", "resolution source codec hdr group size_gb")
+
+RESOLUTION_RANK = {"480p": 1, "576p": 2, "720p": 3, "1080p": 4, "2160p": 5}
+
+
+def _release_pattern(alternatives):
+    return re.compile(r'(?<![a-z0-9])(?:' + alternatives + r')(?![a-z0-9])')
+
+
+RELEASE_RESOLUTION = _release_pattern(r'2160p|1080p|720p|576p|480p|4k|uhd')
+RELEASE_SOURCES = [
+    ("REMUX", _release_pattern(r'remux|bdremux')),
+    ("BluRay", _release_pattern(r'blu-?ray|bdrip|brrip')),
+    ("WEB-DL", _release_pattern(r'web-?dl')),
+    ("WEBRip", _release_pattern(r'web-?rip')),
+    ("HDTV", _release_pattern(r'hdtv')),
+    ("DVDRip", _release_pattern(r'dvd-?rip')),
+]
+RELEASE_CODECS = [
+    ("H.265", _release_pattern(r'x265|h\.?265|hevc')),
+    ("H.264", _release_pattern(r'x264|h\.?264|avc')),
+    ("AV1", _release_pattern(r'av1')),
+]
+RELEASE_HDR = [
+    ("DV", _release_pattern(r'dv|dovi|dolby[ .]?vision')),
+    ("HDR10+", _release_pattern(r'hdr10(?:\+|plus)')),
+    ("HDR", _release_pattern(r'hdr(?:10)?')),
+]
+RELEASE_SIZE = re.compile(r'(\d+(?:[.,]\d+)?)\s*(gb|gib|mb|mib)\b', re.IGNORECASE)
+RELEASE_GROUP = re.compile(r'-([A-Za-z0-9]+)\s*$')
+
+
+def parse_release_name(title):
+    """
+    Zerlegt einen Release-Namen wie Dune.Part.Two.2024.2160p.UHD.BluRay.x265-GRP
+    in Auflösung, Quelle, Codec, HDR, Gruppe und Größe (GB). Nicht erkannte
+    Felder sind None.
+    """
+    text = title.lower()
+
+    resolution = None
+    match = RELEASE_RESOLUTION.search(text)
+    if match:
+        resolution = match.group(0)
+        if resolution in ("4k", "uhd"):
+            resolution = "2160p"
+
+    source = next((name for name, pattern in RELEASE_SOURCES if pattern.search(text)), None)
+    codec = next((name for name, pattern in RELEASE_CODECS if pattern.search(text)), None)
+    hdr = [name for name, pattern in RELEASE_HDR if pattern.search(text)]
+    if "HDR10+" in hdr and "HDR" in hdr:
+        hdr.remove("HDR")
+
+    size_gb = None
+    size = RELEASE_SIZE.search(title)
+    if size:
+        size_gb = float(size.group(1).replace(",", "."))
+        if size.group(2).lower().startswith("m"):
+            size_gb /= 1024
+        title = title[:size.start()]
+
+    group = RELEASE_GROUP.search(title.strip(" -–|[]()"))
+
+    return Release(
+        resolution, source, codec, "/".join(hdr) or None,
+        group.group(1) if group else None, size_gb,
+    )
+
+
+def describe_release(release):
+    """Kurzform eines Releases, z. B. "2160p · BluRay · H.265 · DV/HDR · GRP"."""
+    parts = [release.resolution, release.source, release.codec, release.hdr, release.group]
+    if release.size_gb:
+        parts.append(f"{release.size_gb:.1f} GB")
+    return " · ".join(part for part in parts if part)
+
+
+def passes_quality_filters(release):
+    """Prüft die QUALITY_*-Filter; fehlende Angaben im Release-Namen gelten als erfüllt."""
+    if QUALITY_MIN_RESOLUTION and release.resolution:
+        minimum = RESOLUTION_RANK.get(QUALITY_MIN_RESOLUTION.lower(), 0)
+        if RESOLUTION_RANK.get(release.resolution, 0) < minimum:
+            return False
+    if release.source and release.source.lower() in {s.lower() for s in QUALITY_EXCLUDED_SOURCES}:
+        return False
+    if release.group and release.group.lower() in {g.lower() for g in QUALITY_EXCLUDED_GROUPS}:
+        return False
+    if QUALITY_MAX_SIZE_GB and release.size_gb and release.size_gb > QUALITY_MAX_SIZE_GB:
+        return False
+    return True
+
+
+def format_release_message(film_name, film_year, variants):
+    """Telegram-Nachricht (HTML) für einen Film mit einem oder mehreren Releases."""
+    if len(variants) == 1:
+        variant = variants[0]
+        lines = [
+            f"🎬 <b>{html.escape(variant['feed_title'])}</b>",
+            f"📅 Match: {html.escape(film_name)} ({film_year})",
+        ]
+        if variant["label"]:
+            lines.append(f"🎞️ {html.escape(variant['label'])}")
+        lines.append(f"🔗 <a href='{html.escape(variant['link'], quote=True)}'>Download</a>")
+        return "\n".join(lines)
+
+    lines = [f"🎬 <b>{html.escape(film_name.title())} ({film_year})</b> – {len(variants)} Releases"]
+    for variant in sorted(variants, key=lambda v: -v["rank"]):
+        label = html.escape(variant["label"] or variant["feed_title"])
+        lines.append(f"• {label} – <a href='{html.escape(variant['link'], quote=True)}'>Download</a>")
+    return "\n".join(lines)
+
+
+def find_matches(watchlist, feed_posts, seen_links, all_variants=False):
+    """
+    Gleicht Feed-Posts mit der Watchlist ab. Akzeptiert eine Liste von
+    (Titel, Jahr)-Tupeln oder einen bereits aufgebauten WatchlistIndex.
+    Mit all_variants=True wird jeder passende Post geliefert, auch wenn
+    derselbe Film im Durchlauf schon gefunden wurde.
+    """
+    if not isinstance(watchlist, WatchlistIndex):
+        watchlist = WatchlistIndex(watchlist)
+
+    matches = []
+    found_films = set()  # Tracking für bereits gefundene Filme
+
+    logging.info(
+        f"Starte Matching mit {len(watchlist)} Watchlist-Einträgen "
+        f"und {len(feed_posts)} Feed-Posts"
+    )
+
+    for title, link in feed_posts:
+        if link in seen_links:
+            continue
+
+        title_clean = title.lower()
+        logging.debug(f"Prüfe Feed-Titel: {title_clean}")
+
+        # Erster passender Film, der in diesem Durchlauf noch nicht gefunden wurde
+        hit = watchlist.match(title_clean, () if all_variants else found_films)
+        if hit:
+            film_name, film_year = hit
+            match = {
+                'film_name': film_name,
+                'film_year': film_year,
+                'feed_title': title,
+                'link': link
+            }
+            matches.append(match)
+            found_films.add(f"{film_name.lower()}_{film_year}")  # Markiere als gefunden
+            logging.info(
+                f"✅ Match: {film_name} ({film_year}) → {title}"
+            )
+
+    logging.info(f"Matching abgeschlossen: {len(matches)} Matches gefunden")
+    return matches
+
+
+class PollScheduler:
+    """
+    Adaptiver Abfrage-Takt für den Feed.
+
+    Lernt die Veröffentlichungsrate aus den Zeitstempeln der bereits
+    gesehenen Feed-Einträge und wählt das Intervall so, dass pro Abfrage
+    etwa POLL_TARGET_POSTS neue Einträge anfallen, begrenzt auf
+    POLL_MIN_INTERVAL..POLL_MAX_INTERVAL. Nach Fehlern wird exponentiell
+    mit Jitter zurückgefahren.
+    """
+
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 target_posts=POLL_TARGET_POSTS, window=POLL_RATE_WINDOW):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_posts = target_posts
+        self.window = window
+        self._published = {}
+        self.consecutive_errors = 0
+        self.rate_per_hour = None
+        self.interval = min(max(CHECK_INTERVAL, min_interval), max_interval)
+        self.reason = "Start"
+        self.next_check_time = None
+        self._lock = threading.Lock()
+
+    def observe(self, entries):
+        """Merkt sich die Veröffentlichungszeiten der Feed-Einträge."""
+        with self._lock:
+            for entry in entries:
+                if entry.published is not None:
+                    self._published[entry.guid] = entry.published
+
+            cutoff = time.time() - self.window
+            self._published = {
+                guid: ts for guid, ts in self._published.items() if ts >= cutoff
+            }
+
+    def next_interval(self, success):
+        """Berechnet das Intervall bis zum nächsten Check (in Sekunden)."""
+        with self._lock:
+            if success:
+                self.consecutive_errors = 0
+                self.rate_per_hour = len(self._published) * 3600 / self.window
+
+                if self.rate_per_hour > 0:
+                    interval = self.target_posts * 3600 / self.rate_per_hour
+                    self.reason = f"{self.rate_per_hour:.1f} Posts/h"
+                else:
+                    interval = self.max_interval
+                    self.reason = "Feed ruhig"
+
+                # Leichter Jitter, damit die Abfragen nicht im Gleichtakt laufen
+                interval *= random.uniform(0.9, 1.1)
+            else:
+                self.consecutive_errors += 1
+                backoff = self.min_interval * 2 ** (self.consecutive_errors - 1)
+                interval = random.uniform(backoff / 2, backoff)
+                self.reason = f"Backoff nach {self.consecutive_errors} Fehler(n)"
+
+            self.interval = min(max(interval, self.min_interval), self.max_interval)
+            self.next_check_time = datetime.now() + timedelta(seconds=self.interval)
+            return self.interval
+
+    def describe(self):
+        """Kurzbeschreibung der aktuellen Entscheidung für /status."""
+        if self.next_check_time is None:
+            return "⏱️ Nächster Check: ausstehend"
+        return (
+            f"⏱️ Nächster Check: {self.next_check_time.strftime('%H:%M:%S')} "
+            f"(Intervall {self.interval / 60:.0f} min, {self.reason})"
+        )
+
+
+poll_scheduler = PollScheduler()
+
+
+class WatcherState:
+    """Zustand des Watchers zwischen den Zyklen."""
+
+    def __init__(self, seen_links, subscribers, feed_fetcher):
+        self.seen_links = seen_links
+        self.subscribers = subscribers
+        self.feed_fetcher = feed_fetcher
+
+
+def init_watcher():
+    """
+    Lädt seen_links und Watchlists; liefert None, wenn keine Watchlist verfügbar ist.
+
+    Für einen schnellen ersten Abruf kommen Watchlists und Feed-URL aus den
+    lokalen Snapshots; der Abgleich mit Google Drive und der Startseite
+    folgt im Hintergrund (run_watchlist_refresh, refresh_feed_url).
+    """
+    global subscribers
+
+    seen_links = load_seen_links()
+    registry = SubscriberRegistry(load_subscribers())
+    sources = registry.load(refresh=False)
+
+    if not len(registry.index):
+        logging.warning("Keine Watchlist gefunden. Prüfe Google Drive oder file_ID")
+        send_telegram_message("Fehler beim Laden der Watchlist auf Google Drive")
+        return None
+
+    for subscriber in registry.subscribers:
+        size = len(subscriber.provider)
+        source = sources[subscriber.chat_id]
+        if not size:
+            message = "Fehler beim Laden der Watchlist auf Google Drive"
+        elif source == "drive":
+            message = f"✅ Watchlist erfolgreich von Google Drive geladen ({size} Filme)"
+        elif source == "snapshot":
+            message = (
+                f"⚡ Watchlist aus lokalem Snapshot geladen ({size} Filme), "
+                f"Abgleich läuft im Hintergrund"
+            )
+        else:
+            fallback = "lokalen Snapshot" if source is None else "lokale csv-Datei"
+            message = (
+                f"⚠️ Konnte Watchlist nicht von Google Drive laden. "
+                f"Fallback auf {fallback} ({size} Filme)"
+            )
+        send_telegram_message(message, subscriber.chat_id)
+
+    watchlist = list(registry.index)
+    if len(registry) > 1:
+        print(f"👥 {len(registry)} Abonnenten")
+    print(f"🎥 Watchlist geladen: {len(watchlist)} Filme")
+    for film, year in watchlist[:5]:  # Zeige erste 5
+        print(f"  → {film} ({year})")
+    if len(watchlist) > 5:
+        print(f"  ... und {len(watchlist) - 5} weitere")
+
+    subscribers = registry
+
+    feed_url = FeedFetcher.saved_feed_url() or get_dynamic_feed_url()
+    feed_fetcher = FeedFetcher(feed_url)
+    send_telegram_message(
+        "🚀 HDEncode Watcher gestartet"
+    )
+
+    return WatcherState(seen_links, registry, feed_fetcher)
+
+
+def run_watch_cycle(state):
+    """Ein Durchlauf: neue Feed-Einträge abrufen, matchen und benachrichtigen."""
+    with profiler.section("watch_cycle"), metrics.timer("watch_cycle"):
+        success = _run_watch_cycle(state)
+    metrics.inc("hdencode_cycles_total", result="ok" if success else "error")
+    return success
+
+
+def _run_watch_cycle(state):
+    global last_check_time
+
+    try:
+        last_check_time = datetime.now()
+        logging.info(
+            f"Starte Check um {last_check_time.strftime('%H:%M:%S')}"
+        )
+
+        # RSS-Feed abrufen (nur neue Einträge)
+        entries = state.feed_fetcher.fetch_new()
+        if entries is None:
+            logging.warning("Keine RSS-Posts erhalten")
+            return False
+
+        logging.info(f"📦 {len(entries)} neue Feed-Einträge erhalten")
+        metrics.inc("hdencode_posts_fetched_total", state.feed_fetcher.parsed_count)
+        metrics.inc("hdencode_new_posts_total", len(entries))
+        poll_scheduler.observe(state.feed_fetcher.last_entries)
+
+        # Nach längerem Ausfall: aus dem Feed gerutschte Posts über die Seiten nachholen
+        if state.feed_fetcher.gap_since is not None:
+            logging.warning("Feed reicht nicht bis zum letzten verarbeiteten Post – hole Lücke nach")
+            entries = entries + catch_up_missed_posts(
+                state.feed_fetcher.gap_since, (entry.link for entry in entries)
+            )
+
+        def is_new(link, chat_id):
+            key = seen_key(link, chat_id)
+            return key not in state.seen_links and not notification_queue.is_pending(key)
+
+        chat_ids = state.subscribers.chat_ids()
+        posts = []
+        releases = {}
+        for entry in entries:
+            if not any(is_new(entry.link, chat_id) for chat_id in chat_ids):
+                continue
+            # Qualitätsfilter vor dem Abgleich, damit verworfene Releases keinen Film belegen
+            release = parse_release_name(entry.title)
+            if not passes_quality_filters(release):
+                metrics.inc("hdencode_filtered_releases_total")
+                logging.debug(f"Durch Qualitätsfilter verworfen: {entry.title}")
+                continue
+            posts.append((entry.title, entry.link))
+            releases[entry.link] = release
+
+        # Matches suchen: ein Durchlauf über den gemeinsamen Index aller Abonnenten
+        with metrics.timer("find_matches"), watchlist_lock:
+            matches = find_matches(state.subscribers.index, posts, (), all_variants=True)
+            wanted_by = state.subscribers.wanted_by
+        metrics.inc("hdencode_matches_total", len(matches))
+
+        # Matches an die interessierten Chats verteilen; Releases desselben
+        # Films werden in der Warteschlange zu einer Nachricht gruppiert
+        for match in matches:
+            release = releases[match['link']]
+            for chat_id in sorted(wanted_by.get((match['film_name'], match['film_year']), ())):
+                if not is_new(match['link'], chat_id):
+                    continue
+                # Link wird erst nach erfolgreichem Versand als gesehen gespeichert
+                notification_queue.enqueue_release(
+                    match['film_name'], match['film_year'],
+                    {
+                        "feed_title": match['feed_title'],
+                        "link": match['link'],
+                        "seen_key": seen_key(match['link'], chat_id),
+                        "label": describe_release(release),
+                        "rank": RESOLUTION_RANK.get(release.resolution, 0),
+                    },
+                    chat_id=chat_id,
+                )
+
+        if matches:
+            logging.info(f"✅ {len(matches)} neue Matches gefunden")
+
+        state.seen_links.flush()
+        # Eingereihte Nachrichten sichern, bevor die Einträge als verarbeitet gelten
+        notification_queue.flush()
+        state.feed_fetcher.mark_processed(entries)
+        metrics.set_gauge("hdencode_seen_store_size", len(state.seen_links))
+        metrics.set_gauge("hdencode_notification_queue_size", len(notification_queue))
+        return True
+
+    except Exception as e:
+        logging.error(f"Fehler im Watcher-Loop: {e}")
+        return False
+
+
+def refresh_feed_url(feed_fetcher):
+    """Prüft nach einem Warmstart, ob die gespeicherte Feed-URL noch aktuell ist."""
+    feed_url = http_cache.get("feed_url", discover_feed_url, FEED_URL_TTL)
+    if feed_url:
+        feed_fetcher.switch_url(feed_url)
+
+
+async def run_watcher(ready=None):
+    """
+    Hauptfunktion des Watchers als Task der Laufzeit. ready (asyncio.Event)
+    wird nach dem ersten Feed-Abruf gesetzt.
+    """
+    loop = asyncio.get_running_loop()
+
+    try:
+        state = await loop.run_in_executor(None, init_watcher)
+        if state is None:
+            return
+
+        success = await loop.run_in_executor(None, run_watch_cycle, state)
+        startup = time.monotonic() - startup_time
+        metrics.set_gauge("hdencode_startup_seconds", startup)
+        logging.info(f"⚡ Erster Feed-Abruf {startup:.2f}s nach dem Start")
+        if ready is not None:
+            ready.set()
+        await loop.run_in_executor(None, refresh_feed_url, state.feed_fetcher)
+
+        # Hauptschleife; Abbruch des Tasks beendet das Warten sofort
+        while running.is_set():
+            await asyncio.sleep(poll_scheduler.next_interval(success))
+            success = await loop.run_in_executor(None, run_watch_cycle, state)
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logging.error(f"Kritischer Fehler im Watcher: {e}")
+        await loop.run_in_executor(None, send_telegram_message, f"❌ Watcher-Fehler: {e}")
+
+
+async def start_after(event, task_factory):
+    """Wartet auf event und führt dann task_factory() aus."""
+    await event.wait()
+    await task_factory()
+
+
+async def run_runtime():
+    """
+    Gemeinsame Laufzeit: Watcher, Telegram-Bot, Katalog-Backfill und
+    Watchlist-Aktualisierung laufen als Tasks in einer Event-Loop, blockierende Aufrufe in einem begrenzten
+    Thread-Pool. SIGINT/SIGTERM brechen alle Tasks sauber ab. Bot, Backfill
+    und Watchlist-Abgleich starten erst nach dem ersten Feed-Abruf, damit
+    sie ihn nicht mit Importen und Seitenabrufen ausbremsen.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="hdencode")
+    )
+
+    watcher_ready = asyncio.Event()
+    watcher = asyncio.ensure_future(run_watcher(watcher_ready))
+    tasks = [
+        watcher,
+        asyncio.ensure_future(start_after(watcher_ready, run_telegram_bot)),
+        asyncio.ensure_future(start_after(watcher_ready, run_catalog_backfill)),
+        asyncio.ensure_future(start_after(watcher_ready, run_watchlist_refresh)),
+    ]
+    notifier = asyncio.ensure_future(notification_queue.run())
+    metrics_server = start_metrics_server()
+
+    def request_shutdown():
+        logging.info("Beende Watcher...")
+        running.clear()
+        for task in tasks:
+            task.cancel()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, request_shutdown)
+
+    try:
+        await watcher
+    except asyncio.CancelledError:
+        pass
+    finally:
+        running.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        notifier.cancel()
+        await asyncio.gather(notifier, return_exceptions=True)
+        await notification_queue.drain(NOTIFY_DRAIN_TIMEOUT)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if seen_store is not None:
+            await loop.run_in_executor(None, seen_store.flush)
+
+
+def main():
+    """Startet Watcher und Telegram-Bot in der asyncio-Laufzeit (ohne Tray)."""
+    asyncio.run(run_runtime())
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HDEncode Watcher mit Telegram-Bot")
+    parser.add_argument("--profile", nargs="?", type=float, const=1.0, metavar="RATE",
+                        help="Profiling aktivieren; RATE = Anteil der Zyklen/Kommandos (Standard: 1.0)")
+    args = parser.parse_args()
+    if args.profile is not None:
+        profiler.set_rate(args.profile)
+
     print("🎬 Starte HDEncode Watcher (headless mode)")
     print(f"📁 Arbeitsverzeichnis: {SCRIPT_DIR}")
     print(f"📋 Watchlist: {WATCHLIST_CSV}")
@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Offline-Replay und Lasttest für den HDEncode-Watcher.
+
+Startet einen lokalen Ersatz für HDEncode (Startseite, RSS-Feed,
+/page/N/) und die Telegram-API, lenkt den Watcher über die Basis-URLs
+darauf um und misst Watcher-Zyklen sowie parallele /suche- und
+/suchealle-Kommandos. Die Antworten sind synthetisch oder stammen aus
+einer mit --record angelegten Aufzeichnung; Latenz, Fehlerquote,
+304-Antworten und Telegram-Rate-Limits sind einstellbar.
+
+Beispiele:
+    python replay.py                                  # synthetisch, Standardlast
+    python replay.py --cycles 200 --commands 500 --concurrency 16
+    python replay.py --latency 0.2 --jitter 0.1 --error-rate 0.05
+    python replay.py --record aufnahme/               # echte Antworten aufzeichnen
+    python replay.py --replay aufnahme/               # Aufzeichnung abspielen
+    python replay.py --serve --port 8765              # nur Server, dann z. B.:
+        HDENCODE_BASE_URL=http://127.0.0.1:8765 TELEGRAM_API_URL=http://127.0.0.1:8765 \\
+        python hdencode_crawler_linux.py
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+import hdencode_crawler_linux as crawler
+from benchmark import make_posts, make_rss, make_watchlist, write_watchlist_csv
+
+REAL_ORIGINS = ("https://www.hdencode.org", "https://hdencode.org", "https://api.telegram.org")
+
+
+def assert_offline(*urls):
+    """Bricht ab, falls eine der URLs auf einen echten Host aus REAL_ORIGINS zeigt."""
+    real_hosts = {urlparse(origin).hostname for origin in REAL_ORIGINS}
+    for url in urls:
+        if urlparse(url).hostname in real_hosts:
+            raise RuntimeError(f"Replay darf nur den lokalen Server abrufen, nicht {url}")
+
+
+class SyntheticSite:
+    """
+    Synthetischer HDEncode-Bestand. Die Posts liegen im Abstand von zehn
+    Minuten; step() veröffentlicht die nächsten `posts_per_step` Posts.
+    """
+
+    def __init__(self, watchlist, total_posts=5000, posts_per_step=5,
+                 feed_size=50, page_size=20, hit_rate=0.05, seed=1):
+        posts = make_posts(total_posts, watchlist, hit_rate=hit_rate, seed=seed)
+        start = time.time() - total_posts * 600
+        # Älteste zuerst; sichtbar sind die ersten `visible` Posts
+        self.posts = [(title, link, start + i * 600) for i, (title, link) in enumerate(posts)]
+        self.posts_per_step = posts_per_step
+        self.feed_size = feed_size
+        self.page_size = page_size
+        self.visible = min(len(self.posts), max(feed_size, total_posts // 2))
+        self._lock = threading.Lock()
+
+    def step(self):
+        with self._lock:
+            self.visible = min(len(self.posts), self.visible + self.posts_per_step)
+
+    def _newest_first(self):
+        with self._lock:
+            return self.posts[:self.visible][::-1]
+
+    def version(self):
+        return str(self.visible)
+
+    def homepage(self, base_url):
+        return (
+            "<html><head>"
+            f'<link rel="alternate" type="application/rss+xml" href="{base_url}/feed/">'
+            "</head><body>" + self._render_posts(self._newest_first()[:self.page_size])
+            + "</body></html>"
+        )
+
+    def feed(self, base_url):
+        return make_rss(self._newest_first()[:self.feed_size])
+
+    def page(self, page_num, base_url):
+        start = (page_num - 1) * self.page_size
+        posts = self._newest_first()[start:start + self.page_size]
+        if not posts:
+            return None
+        return "<html><body>" + self._render_posts(posts) + "</body></html>"
+
+    @staticmethod
+    def _render_posts(posts):
+        parts = []
+        for title, link, published in posts:
+            stamp = datetime.fromtimestamp(published).astimezone().isoformat()
+            parts.append(
+                f'<article><h2 class="title"><a href="{escape(link)}">{escape(title)}</a></h2>'
+                f'<time datetime="{stamp}">{stamp}</time>'
+                '<a href="/category/movies/" rel="category tag">Movies</a></article>'
+            )
+        return "".join(parts)
+
+
+class RecordedSite:
+    """Spielt eine mit --record angelegte Aufzeichnung ab (homepage.html, feed.xml, page_N.html)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def step(self):
+        pass
+
+    def version(self):
+        return "recorded"
+
+    def homepage(self, base_url):
+        markup = self._read("homepage.html") or ""
+        # Feed-Link auf den lokalen Server umbiegen
+        markup = re.sub(
+            r'href="[^"]*/feed/[^"]*"', f'href="{base_url}/feed/"', markup, count=1
+        )
+        return markup
+
+    def feed(self, base_url):
+        return self._read("feed.xml")
+
+    def page(self, page_num, base_url):
+        return self._read(f"page_{page_num}.html")
+
+
+def record_site(directory, pages):
+    """
+    Zeichnet Startseite, Feed und die ersten `pages` Übersichtsseiten auf.
+    Die Abrufe laufen über crawler.http_client, also mit denselben Headern
+    (User-Agent, Accept-Encoding), Wiederholungen und Abständen wie im Watcher.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def save(name, url, spaced=False):
+        response = crawler.http_client.get(url, timeout=30, spaced=spaced)
+        response.raise_for_status()
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"✓ {url} → {name}")
+        return response.text
+
+    homepage = save("homepage.html", crawler.HDENCODE_BASE_URL)
+    save("feed.xml", crawler.extract_feed_link(homepage) or crawler.FALLBACK_FEED_URL)
+    for page_num in range(1, pages + 1):
+        save(f"page_{page_num}.html", f"{crawler.HDENCODE_BASE_URL}/page/{page_num}/", spaced=True)
+
+
+class StandInServer:
+    """
+    Lokaler Ersatz für HDEncode und die Telegram-Bot-API.
+
+    Jede Antwort wird um `latency` plus zufällig bis zu `jitter` Sekunden
+    verzögert; HDEncode-Anfragen scheitern mit Wahrscheinlichkeit
+    `error_rate` (503), sendMessage mit `telegram_429_rate` (429). Der Feed
+    liefert ein ETag und beantwortet unveränderte Abrufe mit 304.
+    """
+
+    def __init__(self, site, port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 telegram_429_rate=0.0, seed=1):
+        self.site = site
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.telegram_429_rate = telegram_429_rate
+        self.rng = random.Random(seed)
+        self.stats = {}
+        self.messages = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_POST(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _chance(self, rate):
+        with self._lock:
+            return rate and self.rng.random() < rate
+
+    def handle(self, request):
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        path = urlparse(request.path).path
+        if path.startswith("/bot"):
+            return self._handle_telegram(request, path)
+
+        if self._chance(self.error_rate):
+            self._count("503")
+            return self._send(request, 503, "text/plain", "Service Unavailable")
+
+        page = re.fullmatch(r"/page/(\d+)/?", path)
+        if path in ("", "/"):
+            self._count("homepage")
+            return self._send(request, 200, "text/html", self.site.homepage(self.base_url))
+        if path.rstrip("/") == "/feed":
+            etag = f'"{self.site.version()}"'
+            if request.headers.get("If-None-Match") == etag:
+                self._count("feed_304")
+                return self._send(request, 304, None, None)
+            self._count("feed")
+            return self._send(
+                request, 200, "application/rss+xml", self.site.feed(self.base_url),
+                {"ETag": etag},
+            )
+        if page:
+            markup = self.site.page(int(page.group(1)), self.base_url)
+            if markup is not None:
+                self._count("page")
+                return self._send(request, 200, "text/html", markup)
+
+        self._count("404")
+        return self._send(request, 404, "text/plain", "Not Found")
+
+    def _handle_telegram(self, request, path):
+        method = path.rsplit("/", 1)[-1]
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        if "json" in (request.headers.get("Content-Type") or ""):
+            params = json.loads(body or b"{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+
+        if method == "sendMessage":
+            if self._chance(self.telegram_429_rate):
+                self._count("telegram_429")
+                return self._send_json(request, 429, {
+                    "ok": False, "error_code": 429,
+                    "description": "Too Many Requests", "parameters": {"retry_after": 1},
+                })
+            with self._lock:
+                self.messages.append((str(params.get("chat_id")), params.get("text", "")))
+                message_id = len(self.messages)
+            self._count("telegram_sendMessage")
+            return self._send_json(request, 200, {"ok": True, "result": {
+                "message_id": message_id, "date": int(time.time()),
+                "chat": {"id": params.get("chat_id"), "type": "private"},
+                "text": params.get("text", ""),
+            }})
+
+        self._count(f"telegram_{method}")
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Replay", "username": "replay_bot"}
+        elif method == "getUpdates":
+            # Long-Polling kurz nachbilden, damit der Bot nicht im Leerlauf kreist
+            time.sleep(min(float(params.get("timeout") or 0), 1.0))
+            result = []
+        else:
+            result = True
+        return self._send_json(request, 200, {"ok": True, "result": result})
+
+    def _send_json(self, request, status, payload):
+        return self._send(request, status, "application/json", json.dumps(payload))
+
+    @staticmethod
+    def _send(request, status, content_type, body, headers=None):
+        payload = body.encode("utf-8") if body else b""
+        request.send_response(status)
+        if content_type:
+            request.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        for key, value in (headers or {}).items():
+            request.send_header(key, value)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        if payload:
+            request.wfile.write(payload)
+
+
+class FakeMessage:
+    """Minimaler Ersatz für telegram.Message: sammelt Antworten und Bearbeitungen."""
+
+    def __init__(self):
+        self.replies = []
+
+    def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return self
+
+    def edit_text(self, text, **kwargs):
+        self.replies.append(text)
+        return self
+
+
+def setup_watcher(tmp, base_url, watchlist):
+    """Richtet den Watcher mit Zustand in `tmp` gegen den lokalen Server ein."""
+    crawler.HDENCODE_BASE_URL = base_url
+    crawler.FALLBACK_FEED_URL = f"{base_url}/feed/"
+    crawler.TELEGRAM_API_URL = base_url
+    assert_offline(crawler.HDENCODE_BASE_URL, crawler.FALLBACK_FEED_URL, crawler.TELEGRAM_API_URL)
+    crawler.TELEGRAM_TOKEN = "replay"
+    crawler.TELEGRAM_CHAT_ID = "1"
+    crawler.TELEGRAM_RATE_PER_SEC = 1000
+    crawler.TELEGRAM_RATE_BURST = 1000
+    crawler.NOTIFY_GROUP_WINDOW = 0
+
+    crawler.http_cache = crawler.SingleFlightCache()
+    crawler.catalog = crawler.CatalogStore(os.path.join(tmp, "catalog.db"))
+    crawler.notification_queue = crawler.NotificationQueue(os.path.join(tmp, "pending.json"))
+    seen_links = crawler.load_seen_links(
+        os.path.join(tmp, "seen_links.db"), os.path.join(tmp, "seen_links.txt")
+    )
+
+    csv_path = os.path.join(tmp, "watchlist.csv")
+    write_watchlist_csv(watchlist, csv_path)
+    provider = crawler.WatchlistProvider(
+        cache_path=os.path.join(tmp, "watchlist_cache.bin"), csv_path=csv_path, sheet_id=None
+    )
+    registry = crawler.SubscriberRegistry([crawler.Subscriber("1", "replay", provider)])
+    registry.load()
+    crawler.subscribers = registry
+
+    feed_url = crawler.get_dynamic_feed_url()
+    assert_offline(feed_url)
+    feed_fetcher = crawler.FeedFetcher(feed_url, os.path.join(tmp, "feed_state.json"))
+    return crawler.WatcherState(seen_links, registry, feed_fetcher)
+
+
+def run_cycles(state, site, cycles, change_every):
+    """Führt Watcher-Zyklen aus; der Bestand wächst alle `change_every` Zyklen."""
+    durations = []
+    errors = 0
+    for cycle in range(cycles):
+        if cycle % change_every == 0:
+            site.step()
+        start = time.perf_counter()
+        if not crawler.run_watch_cycle(state):
+            errors += 1
+        durations.append(time.perf_counter() - start)
+    return durations, errors
+
+
+def deliver_notifications(timeout):
+    """Stellt die eingereihten Nachrichten an den lokalen Telegram-Ersatz zu."""
+    async def drain():
+        await crawler.notification_queue.drain(timeout)
+
+    start = time.perf_counter()
+    asyncio.run(drain())
+    return time.perf_counter() - start
+
+
+def run_commands(queries, concurrency):
+    """Führt (Handler, Suchbegriff)-Paare parallel aus; liefert Laufzeiten pro Kommando."""
+    def run(item):
+        handler, query = item
+        update = SimpleNamespace(message=FakeMessage(), effective_chat=SimpleNamespace(id=1))
+        context = SimpleNamespace(args=query.split())
+        start = time.perf_counter()
+        try:
+            handler(update, context)
+            ok = True
+        except Exception as e:
+            logging.error(f"Kommando fehlgeschlagen ({query}): {e}")
+            ok = False
+        return handler.__name__, time.perf_counter() - start, ok
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, queries))
+
+
+def make_queries(watchlist, count, search_ratio, seed):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        handler = crawler.handle_search if rng.random() < search_ratio else crawler.handle_search_all
+        if rng.random() < 0.5:
+            query = rng.choice(watchlist)[0]
+        else:
+            query = f"fehlt{rng.randint(0, 10 ** 6)}"
+        queries.append((handler, query))
+    return queries
+
+
+def summarize(name, durations, errors, wall_time):
+    durations = sorted(durations)
+    if not durations:
+        return None
+
+    def pct(q):
+        return durations[min(len(durations) - 1, int(len(durations) * q))] * 1000
+
+    return {
+        "name": name,
+        "count": len(durations),
+        "errors": errors,
+        "throughput": len(durations) / wall_time if wall_time else float("inf"),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": durations[-1] * 1000,
+    }
+
+
+def print_report(rows, server):
+    print(f"\n{'Szenario':<16} {'Anzahl':>7} {'Fehler':>7} {'Ops/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in rows:
+        print(f"{r['name']:<16} {r['count']:>7} {r['errors']:>7} {r['throughput']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}")
+
+    print("\nServer-Anfragen:")
+    for key, value in sorted(server.stats.items()):
+        print(f"  {key:<24} {value}")
+    print(f"  Telegram-Nachrichten     {len(server.messages)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Replay und Lasttest für den HDEncode-Watcher")
+    parser.add_argument("--cycles", type=int, default=50, help="Watcher-Zyklen (Standard: 50)")
+    parser.add_argument("--commands", type=int, default=100, help="Bot-Kommandos (Standard: 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallele Kommandos")
+    parser.add_argument("--search-ratio", type=float, default=0.7,
+                        help="Anteil /suche an den Kommandos, Rest /suchealle (Standard: 0.7)")
+    parser.add_argument("--watchlist", type=int, default=1000, help="Größe der Watchlist")
+    parser.add_argument("--posts", type=int, default=5000, help="Synthetische Posts insgesamt")
+    parser.add_argument("--posts-per-step", type=int, default=5, help="Neue Posts pro Änderung")
+    parser.add_argument("--change-every", type=int, default=1,
+                        help="Feed ändert sich alle N Zyklen, sonst 304 (Standard: 1)")
+    parser.add_argument("--feed-size", type=int, default=50, help="Einträge im RSS-Feed")
+    parser.add_argument("--latency", type=float, default=0.0, help="Grundlatenz je Antwort (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Zusätzliche Zufallslatenz (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil 503-Antworten")
+    parser.add_argument("--telegram-429-rate", type=float, default=0.0,
+                        help="Anteil 429-Antworten bei sendMessage")
+    parser.add_argument("--drain-timeout", type=float, default=30, help="Zeit für die Zustellung (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0, help="Port des lokalen Servers")
+    parser.add_argument("--replay", metavar="DIR", help="Aufzeichnung statt synthetischer Daten")
+    parser.add_argument("--record", metavar="DIR", help="Echte Antworten aufzeichnen und beenden")
+    parser.add_argument("--record-pages", type=int, default=5, help="Aufzuzeichnende Seiten")
+    parser.add_argument("--serve", action="store_true", help="Nur den lokalen Server betreiben")
+    parser.add_argument("--step-interval", type=float, default=60,
+                        help="--serve: neue Posts alle N Sekunden (Standard: 60)")
+    parser.add_argument("--verbose", action="store_true", help="Log-Ausgaben des Watchers zeigen")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    if args.record:
+        record_site(args.record, args.record_pages)
+        return 0
+
+    watchlist = make_watchlist(args.watchlist, args.seed)
+    if args.replay:
+        site = RecordedSite(args.replay)
+    else:
+        site = SyntheticSite(
+            watchlist, total_posts=args.posts, posts_per_step=args.posts_per_step,
+            feed_size=args.feed_size, seed=args.seed,
+        )
+
+    server = StandInServer(
+        site, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, telegram_429_rate=args.telegram_429_rate, seed=args.seed,
+    )
+
+    with server:
+        print(f"🧪 Lokaler Server: {server.base_url}")
+
+        if args.serve:
+            print(f"   HDENCODE_BASE_URL={server.base_url} TELEGRAM_API_URL={server.base_url}")
+            try:
+                while True:
+                    time.sleep(args.step_interval)
+                    site.step()
+            except KeyboardInterrupt:
+                print_report([], server)
+            return 0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            state = setup_watcher(tmp, server.base_url, watchlist)
+            rows = []
+
+            start = time.perf_counter()
+            durations, errors = run_cycles(state, site, args.cycles, max(1, args.change_every))
+            rows.append(summarize("Watcher-Zyklus", durations, errors, time.perf_counter() - start))
+
+            queued = len(crawler.notification_queue)
+            drain_time = deliver_notifications(args.drain_timeout)
+            print(f"📨 {queued - len(crawler.notification_queue)} von {queued} Nachrichten "
+                  f"in {drain_time:.1f}s zugestellt")
+
+            start = time.perf_counter()
+            results = run_commands(
+                make_queries(watchlist, args.commands, args.search_ratio, args.seed),
+                args.concurrency,
+            )
+            wall_time = time.perf_counter() - start
+            for name, label in (("handle_search", "/suche"), ("handle_search_all", "/suchealle")):
+                selected = [r for r in results if r[0] == name]
+                row = summarize(
+                    label, [r[1] for r in selected],
+                    sum(1 for r in selected if not r[2]), wall_time,
+                )
+                if row:
+                    rows.append(row)
+
+            print_report(rows, server)
+            crawler.seen_store.flush()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
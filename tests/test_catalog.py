@@ -0,0 +1,62 @@
+"""Katalog: optionaler Suchindex, der Watcher läuft auch ohne ihn."""
+import os
+import sqlite3
+
+import hdencode_crawler_linux as crawler
+import pytest
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "hdencode_page.html")
+
+
+class FakePageClient:
+    def get(self, url, **kwargs):
+        with open(FIXTURE, encoding="utf-8") as f:
+            text = f.read()
+        return type("Response", (), {"text": text, "raise_for_status": lambda self: None})()
+
+
+@pytest.fixture
+def broken_catalog(monkeypatch):
+    attempts = []
+
+    def fail(*args, **kwargs):
+        attempts.append(args)
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(crawler, "CatalogStore", fail)
+    monkeypatch.setattr(crawler, "catalog", None)
+    monkeypatch.setattr(crawler, "catalog_failed_at", None)
+    return attempts
+
+
+def test_page_crawl_works_without_catalog(broken_catalog, monkeypatch):
+    monkeypatch.setattr(crawler, "http_client", FakePageClient())
+
+    posts = crawler.fetch_page_posts(1)
+
+    assert posts
+    assert crawler.get_catalog() is None
+    # Erneuter Versuch erst nach CATALOG_RETRY_INTERVAL
+    assert len(broken_catalog) == 1
+
+
+def test_catalog_is_retried_after_interval(broken_catalog, monkeypatch):
+    assert crawler.get_catalog() is None
+    monkeypatch.setattr(crawler, "CATALOG_RETRY_INTERVAL", 0)
+    assert crawler.get_catalog() is None
+    assert len(broken_catalog) == 2
+
+
+def test_feed_flag_follows_current_feed_window(tmp_path):
+    store = crawler.CatalogStore(str(tmp_path / "catalog.db"))
+    dune = ("Dune 2021 1080p BluRay x264-GRP", "https://hdencode.org/dune/", None)
+    alien = ("Alien 1979 2160p UHD BluRay x265-GRP", "https://hdencode.org/alien/", None)
+    heat = ("Heat 1995 1080p BluRay x264-GRP", "https://hdencode.org/heat/", None)
+
+    store.set_feed([dune, alien])
+    store.set_feed([alien, heat])
+
+    assert store.search("dune", feed_only=True) == []
+    assert store.search("dune") == [dune[:2]]
+    assert store.search("alien", feed_only=True) == [alien[:2]]
+    assert store.search("heat", feed_only=True) == [heat[:2]]
@@ -0,0 +1,90 @@
+"""FeedFetcher: Feed-Cache und last_entries nach einem Neustart."""
+import hdencode_crawler_linux as crawler
+import pytest
+from benchmark import make_rss
+
+FEED_URL = "https://hdencode.org/feed/"
+POSTS = [(f"Film {i} 2024 1080p WEB-DL x264-GRP", f"https://hdencode.org/post-{i}/") for i in range(50)]
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.body = body.encode("utf-8")
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = FEED_URL
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class FakeFeedServer:
+    """Liefert den Feed mit ETag und beantwortet passende Validatoren mit 304."""
+
+    def __init__(self, posts):
+        self.posts = posts
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        etag = f'"{abs(hash(tuple(self.posts)))}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse("", status_code=304)
+        return FakeResponse(make_rss(self.posts), headers={"ETag": etag})
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    server = FakeFeedServer(POSTS)
+    monkeypatch.setattr(crawler, "http_client", server)
+    monkeypatch.setattr(crawler, "http_cache", crawler.SingleFlightCache())
+    monkeypatch.setattr(crawler, "catalog", crawler.CatalogStore(str(tmp_path / "catalog.db")))
+    return server
+
+
+def run_cycle(fetcher):
+    entries = fetcher.fetch_new()
+    fetcher.mark_processed(entries)
+    return entries
+
+
+def test_restart_keeps_full_feed_in_cache(server, tmp_path):
+    state_path = str(tmp_path / "feed_state.json")
+    assert len(run_cycle(crawler.FeedFetcher(FEED_URL, state_path))) == 50
+
+    # Neustart: Zustand von der Platte, aber leerer Prozess-Cache
+    crawler.http_cache = crawler.SingleFlightCache()
+    fetcher = crawler.FeedFetcher(FEED_URL, state_path)
+    assert run_cycle(fetcher) == []
+    assert len(fetcher.last_entries) == 50
+    assert crawler.get_rss_posts(FEED_URL) == POSTS
+
+    # Folgezyklus: 304, Cache bleibt vollständig
+    assert run_cycle(fetcher) == []
+    assert "If-None-Match" in server.requests[-1]
+    assert crawler.get_rss_posts(FEED_URL) == POSTS
+
+
+def test_early_stop_merges_with_previous_window(server, tmp_path):
+    fetcher = crawler.FeedFetcher(FEED_URL, str(tmp_path / "feed_state.json"))
+    run_cycle(fetcher)
+
+    new_post = ("Neuer Film 2025 2160p BluRay x265-GRP", "https://hdencode.org/post-new/")
+    server.posts = [new_post] + POSTS[:-1]
+    entries = run_cycle(fetcher)
+
+    assert [entry.link for entry in entries] == [new_post[1]]
+    assert fetcher.parsed_count == 2  # Abbruch beim ersten bekannten Eintrag
+    assert len(fetcher.last_entries) == 50
+    assert crawler.get_rss_posts(FEED_URL)[:2] == [new_post, POSTS[0]]
@@ -0,0 +1,101 @@
+"""HttpClient: Abstand nur beim Crawl, Circuit Breaker nach unerwarteten Fehlern."""
+import time
+
+import hdencode_crawler_linux as crawler
+import pytest
+
+URL = "https://hdencode.org/feed/"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession([FakeResponse()])
+    monkeypatch.setattr(crawler, "get_http_session", lambda: session)
+    return session
+
+
+def make_client(**kwargs):
+    kwargs.setdefault("limiter", crawler.HostLimiter(max_parallel=3, min_delay=0.2))
+    return crawler.HttpClient(retries=0, **kwargs)
+
+
+def test_single_requests_are_not_spaced(session):
+    client = make_client()
+    start = time.monotonic()
+    for _ in range(5):
+        client.get(URL)
+    assert time.monotonic() - start < 0.1
+
+
+def test_crawl_requests_keep_min_delay(session):
+    client = make_client()
+    start = time.monotonic()
+    for _ in range(3):
+        client.get(URL, spaced=True)
+    assert time.monotonic() - start >= 0.4
+
+
+def test_probe_with_unexpected_error_does_not_stick_half_open(session):
+    client = make_client(failure_threshold=1, reset_timeout=0)
+    session.results = [FakeResponse(503), RuntimeError("kaputt"), FakeResponse()]
+
+    client.get(URL)
+    assert client.is_open(URL)
+
+    with pytest.raises(RuntimeError):
+        client.get(URL)  # Testanfrage scheitert unerwartet
+    assert client.is_open(URL)
+
+    assert client.get(URL).status_code == 200  # nächste Testanfrage darf durch
+    assert not client.is_open(URL)
+
+
+def test_breaker_short_circuits_while_open(session):
+    client = make_client(failure_threshold=2, reset_timeout=60)
+    session.results = [FakeResponse(503)]
+
+    client.get(URL)
+    client.get(URL)
+    with pytest.raises(crawler.CircuitOpenError):
+        client.get(URL)
+    assert session.calls == 2
+
+
+def test_backfill_probes_after_reset_timeout(session, monkeypatch, tmp_path):
+    client = make_client(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(crawler, "http_client", client)
+    monkeypatch.setattr(crawler, "catalog", crawler.CatalogStore(str(tmp_path / "catalog.db")))
+    crawled = []
+    monkeypatch.setattr(crawler, "crawl_pages", lambda pages, on_page: crawled.append(list(pages)))
+
+    breaker = client.breaker(crawler.HDENCODE_BASE_URL)
+    breaker.record_failure()
+    crawler.backfill_catalog_step()
+    assert crawled == []  # Pause läuft noch
+
+    breaker.opened_at -= 60
+    assert client.is_open(crawler.HDENCODE_BASE_URL)
+    crawler.backfill_catalog_step()
+    assert len(crawled) == 1  # Backfill selbst ist die Testanfrage
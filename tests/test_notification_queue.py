@@ -0,0 +1,121 @@
+"""NotificationQueue: Nachrichten über dem Telegram-Limit an Eintragsgrenzen teilen."""
+import asyncio
+import os
+import re
+import threading
+
+import hdencode_crawler_linux as crawler
+import pytest
+
+LIMIT = crawler.TELEGRAM_MAX_LENGTH
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return crawler.NotificationQueue(str(tmp_path / "pending.json"))
+
+
+def variant(i):
+    link = f"https://hdencode.org/dune-2021-release-{i}-{'x' * 150}/"
+    return {
+        "feed_title": f"Dune 2021 2160p UHD BluRay x265-GRP{i}",
+        "link": link,
+        "seen_key": link,
+        "label": f"2160p · BluRay · H.265 · GRP{i}",
+        "rank": i % 5,
+    }
+
+
+def assert_complete_html(text):
+    assert len(text) <= LIMIT
+    assert text.count("<a ") == text.count("</a>")
+    assert text.count("<b>") == text.count("</b>")
+
+
+def test_split_message_keeps_lines_intact():
+    lines = [f"• Release {i} – <a href='https://hdencode.org/{i}/'>Download</a>" for i in range(400)]
+    parts = crawler.split_message("\n".join(lines))
+
+    assert len(parts) > 1
+    for part in parts:
+        assert_complete_html(part)
+    assert "\n".join(parts).split("\n") == lines
+
+
+def test_split_message_cuts_only_overlong_lines():
+    parts = crawler.split_message("x" * (LIMIT + 10))
+    assert [len(part) for part in parts] == [LIMIT, 10]
+
+
+def test_long_text_is_enqueued_in_parts(queue):
+    text = "\n\n".join(f"🎬 <b>Film {i}</b>\n🔗 <a href='https://hdencode.org/{i}/'>Download</a>" for i in range(200))
+    queue.enqueue(text, links=["a", "b"], chat_id="1")
+
+    items = queue._items
+    assert len(items) > 1
+    for item in items:
+        assert_complete_html(item["text"])
+    assert [item["links"] for item in items] == [[]] * (len(items) - 1) + [["a", "b"]]
+
+
+def test_grouped_releases_start_a_new_message_when_full(queue):
+    variants = [variant(i) for i in range(60)]
+    for v in variants:
+        queue.enqueue_release("dune", "2021", v, chat_id="1", window=0)
+
+    items = queue._items
+    assert len(items) > 1
+    assert all(item["sealed"] for item in items[:-1])
+    for item in items:
+        assert_complete_html(item["text"])
+    assert sum((item["links"] for item in items), []) == [v["seen_key"] for v in variants]
+
+    chat_id, batch, text = queue._next_batch()
+    assert_complete_html(text)
+    assert len(re.findall(r"<a ", text)) == sum(len(item["variants"]) for item in batch)
+
+
+def test_releases_from_consecutive_polls_are_grouped_by_default(queue):
+    assert queue.group_window >= crawler.POLL_MIN_INTERVAL
+    queue.enqueue_release("dune", "2021", variant(1), chat_id="1")
+    assert queue._next_batch() is None  # wartet auf weitere Releases
+
+    queue.enqueue_release("dune", "2021", variant(2), chat_id="1")
+    assert len(queue) == 1
+    assert len(queue._items[0]["variants"]) == 2
+
+
+def test_zero_window_sends_immediately(tmp_path):
+    queue = crawler.NotificationQueue(str(tmp_path / "pending.json"), group_window="0")
+    queue.enqueue_release("dune", "2021", variant(1), chat_id="1")
+    assert queue._next_due_delay() == 0
+    assert queue._next_batch() is not None
+
+
+@pytest.mark.parametrize("value, expected", [("900", 900.0), ("-5", 0.0), ("bald", 0.0), ("nan", 0.0)])
+def test_group_window_is_parsed_defensively(tmp_path, value, expected):
+    queue = crawler.NotificationQueue(str(tmp_path / "pending.json"), group_window=value)
+    assert queue.group_window == expected
+
+
+def test_enqueue_saves_only_on_flush(queue):
+    for i in range(50):
+        queue.enqueue_release("Dune", "2021", variant(i), chat_id="1", window=60)
+        queue.enqueue(f"Nachricht {i}", chat_id="1")
+    assert not os.path.exists(queue.path)
+
+    queue.flush()
+    assert len(crawler.NotificationQueue(queue.path)) == len(queue)
+
+
+def test_delivery_bookkeeping_runs_off_the_event_loop(queue, monkeypatch):
+    threads = []
+    monkeypatch.setattr(crawler, "post_telegram_message", lambda chat_id, text: (True, None, False))
+    monkeypatch.setattr(crawler, "save_seen_link", lambda link: threads.append(threading.current_thread()))
+    queue.enqueue("Hallo", links=["https://hdencode.org/dune/"], chat_id="1")
+
+    asyncio.run(queue._send_pending())
+
+    assert len(queue) == 0
+    assert threads and threading.main_thread() not in threads
+    assert crawler.NotificationQueue(queue.path)._items == []
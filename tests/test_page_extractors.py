@@ -0,0 +1,75 @@
+"""lxml- und bs4-Extraktion der Übersichtsseiten liefern identische Posts."""
+import os
+
+import hdencode_crawler_linux as crawler
+import pytest
+from replay import SyntheticSite
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "hdencode_page.html")
+BACKENDS = ["lxml", "bs4"]
+
+pytestmark = pytest.mark.skipif(crawler.load_lxml_html() is None, reason="lxml nicht installiert")
+
+
+@pytest.fixture
+def markup():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_wordpress_fixture(markup, backend):
+    posts = crawler.extract_page_posts(markup, backend)
+
+    assert posts == [
+        crawler.PagePost(
+            "Dune: Part Two 2024 2160p UHD BluRay x265-GRP",
+            "https://hdencode.org/dune-part-two-2024-2160p/",
+            1751709600.0,  # verschachteltes <time> in span.posted-on > a
+            "Movies",
+        ),
+        crawler.PagePost(
+            "Amélie 2001 1080p BluRay x264-<GRP>",
+            "https://hdencode.org/amelie-2001-1080p/",
+            1751707800.0,
+            "Movies",
+        ),
+        crawler.PagePost(
+            "The Bear S03 1080p WEB-DL",
+            "https://hdencode.org/the-bear-s03/",
+            None,
+            "TV Shows",
+        ),
+    ]
+
+
+def test_backends_agree_on_fixture(markup):
+    assert crawler.extract_page_posts(markup, "lxml") == crawler.extract_page_posts(markup, "bs4")
+
+
+def test_backends_agree_on_synthetic_pages():
+    site = SyntheticSite([("dune", "2021")], total_posts=200, hit_rate=0.2)
+    for page_num in (1, 2, 5):
+        markup = site.page(page_num, "https://hdencode.org")
+        lxml_posts = crawler.extract_page_posts(markup, "lxml")
+        assert len(lxml_posts) == site.page_size
+        assert all(post.published is not None for post in lxml_posts)
+        assert lxml_posts == crawler.extract_page_posts(markup, "bs4")
+
+
+def test_feed_link_in_head(markup):
+    assert crawler.extract_feed_link(markup)
+
+
+@pytest.mark.parametrize("page, expected", [
+    ('<html><head></head><body><link rel="alternate" type="application/rss+xml" '
+     'href="https://hdencode.org/feed/?sfw=pass1"></body></html>', "https://hdencode.org/feed/?sfw=pass1"),
+    ('<html><head><link type="application/rss+xml"></head><body>'
+     '<link type="application/rss+xml" href="https://hdencode.org/feed/"></body></html>', None),
+    ("<html><head></head><body><p>Kein Feed</p></body></html>", None),
+])
+def test_feed_link_matches_soup_find(page, expected):
+    bs4 = pytest.importorskip("bs4")
+    link = bs4.BeautifulSoup(page, "html.parser").find("link", {"type": "application/rss+xml"})
+    assert (link.get("href") if link else None) == expected
+    assert crawler.extract_feed_link(page) == expected
@@ -0,0 +1,15 @@
+"""Profiler: Stichprobenrate aus Umgebung/Argumenten robust übernehmen."""
+import hdencode_crawler_linux as crawler
+import pytest
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("0.05", 0.05), ("1", 1.0), ("2.5", 1.0), (-3, 0.0),
+    ("abc", 0.0), ("nan", 0.0), (None, 0.0), (0, 0.0),
+])
+def test_rate_is_parsed_and_clamped(tmp_path, value, expected):
+    profiler = crawler.Profiler(directory=str(tmp_path), rate=value)
+    assert profiler.rate == expected
+
+    profiler.set_rate(value)
+    assert profiler.rate == expected
@@ -0,0 +1,52 @@
+"""Replay: Schutz vor echten Hosts und Aufzeichnung über den Crawler-Client."""
+import pytest
+import replay
+from benchmark import make_watchlist
+
+
+def test_local_urls_pass():
+    replay.assert_offline("http://127.0.0.1:8765", "http://127.0.0.1:8765/feed/")
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.hdencode.org/page/2/",
+    "http://hdencode.org/feed/?sfw=pass1",
+    "https://api.telegram.org/botTOKEN/sendMessage",
+])
+def test_real_hosts_are_rejected(url):
+    with pytest.raises(RuntimeError):
+        replay.assert_offline("http://127.0.0.1:8765", url)
+
+
+
+class RecordingClient:
+    def __init__(self, site, base_url):
+        self.site = site
+        self.base_url = base_url
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        if url == self.base_url:
+            text = self.site.homepage(self.base_url)
+        elif "/feed/" in url:
+            text = self.site.feed(self.base_url)
+        else:
+            text = self.site.page(int(url.rstrip("/").rsplit("/", 1)[1]), self.base_url)
+        return type("Response", (), {"text": text, "raise_for_status": lambda self: None})()
+
+
+def test_record_site_goes_through_crawler_client(tmp_path, monkeypatch):
+    base_url = "http://127.0.0.1:8765"
+    client = RecordingClient(replay.SyntheticSite(make_watchlist(20), total_posts=60), base_url)
+    monkeypatch.setattr(replay.crawler, "HDENCODE_BASE_URL", base_url)
+    monkeypatch.setattr(replay.crawler, "http_client", client)
+
+    replay.record_site(str(tmp_path), pages=2)
+
+    assert client.urls == [
+        base_url, f"{base_url}/feed/", f"{base_url}/page/1/", f"{base_url}/page/2/",
+    ]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "feed.xml", "homepage.html", "page_1.html", "page_2.html",
+    ]
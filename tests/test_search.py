@@ -0,0 +1,49 @@
+"""Suche: HTML-sichere Trefferlisten und schneller Abbruch des Seiten-Crawls."""
+import re
+import threading
+import time
+
+import hdencode_crawler_linux as crawler
+
+LINK = "https://hdencode.org/l'amour-&-co/?a=1&b=2"
+
+
+def assert_links_escaped(text):
+    hrefs = re.findall(r"href='([^']*)'", text)
+    assert hrefs and all("&amp;" in href and "&#x27;" in href for href in hrefs)
+
+
+def test_search_results_escape_links():
+    text = crawler.format_search_results([("L'Amour & Co 2024 1080p", LINK)])
+    assert_links_escaped(text)
+    assert "L&#x27;Amour &amp; Co" in text
+
+
+def test_release_messages_escape_links():
+    variant = {"feed_title": "Fast & Furious 2001 1080p", "link": LINK,
+               "label": "1080p · BluRay", "rank": 3}
+    single = crawler.format_release_message("fast & furious", "2001", [variant])
+    grouped = crawler.format_release_message("fast & furious", "2001", [variant, dict(variant, rank=1)])
+    for text in (single, grouped):
+        assert_links_escaped(text)
+        assert "& " not in text
+
+
+def test_cancel_stops_crawl_without_waiting_for_slow_pages(monkeypatch):
+    cancel = threading.Event()
+    fetched = []
+
+    def fetch(page_num):
+        fetched.append(page_num)
+        if page_num == 1:
+            time.sleep(2)  # langsame Seite
+        elif page_num == 2:
+            cancel.set()  # /abbrechen während des Crawls
+        return []
+
+    monkeypatch.setattr(crawler, "get_page_posts", fetch)
+    start = time.monotonic()
+    crawler.search_hdencode_pages("dune", max_pages=20, cancel=cancel)
+
+    assert time.monotonic() - start < 1.5
+    assert sorted(fetched) == [1, 2]
@@ -0,0 +1,105 @@
+"""WatchlistIndex: inkrementelle Updates liefern dieselben Treffer wie ein Neuaufbau."""
+import random
+
+import hdencode_crawler_linux as crawler
+
+FEED_TITLE = "Batman Returns 2024 1080p BluRay x264-GRP"
+
+
+def test_added_title_keeps_watchlist_priority():
+    index = crawler.WatchlistIndex([("Batman", "2024")])
+    assert index.match(FEED_TITLE) == ("Batman", "2024")
+
+    # Der neue, spezifischere Titel steht in der Watchlist vorne
+    watchlist = [("Batman Returns", "2024"), ("Batman", "2024")]
+    assert index.update(watchlist) == (1, 0)
+
+    fresh = crawler.WatchlistIndex(watchlist)
+    assert list(index) == list(fresh) == watchlist
+    assert index.match(FEED_TITLE) == fresh.match(FEED_TITLE) == ("Batman Returns", "2024")
+
+
+def test_reordered_watchlist_changes_priority():
+    index = crawler.WatchlistIndex([("Batman Returns", "2024"), ("Batman", "2024")])
+    watchlist = [("Batman", "2024"), ("Batman Returns", "2024")]
+    assert index.update(watchlist) == (0, 0)
+
+    assert list(index) == watchlist
+    assert index.match(FEED_TITLE) == crawler.WatchlistIndex(watchlist).match(FEED_TITLE)
+
+
+def test_update_with_removals_matches_fresh_build():
+    index = crawler.WatchlistIndex(
+        [("Dune", "2021"), ("Batman", "2024"), ("Alien", "1979"), ("Batman Returns", "2024")],
+        fuzzy=True,
+    )
+    watchlist = [("Batman Returns", "2024"), ("Alien", "1979"), ("Batman", "2024")]
+    assert index.update(watchlist) == (0, 1)
+
+    fresh = crawler.WatchlistIndex(watchlist, fuzzy=True)
+    assert list(index) == watchlist
+    assert index.normalized() == fresh.normalized()
+    for title in (FEED_TITLE, "Alien 1979 2160p UHD", "Dune 2021 720p"):
+        assert index.match(title) == fresh.match(title)
+
+
+def legacy_find_matches(watchlist, feed_posts):
+    """Abgleich wie vor dem WatchlistIndex: is_title_match() über die ganze Watchlist."""
+    matches = []
+    found_films = set()
+    for title, link in feed_posts:
+        for film_name, film_year in watchlist:
+            film_key = f"{film_name.lower()}_{film_year}"
+            if film_key in found_films:
+                continue
+            if crawler.is_title_match(film_name, film_year, title.lower()):
+                matches.append((film_name, film_year, link))
+                found_films.add(film_key)
+                break
+    return matches
+
+
+WORDS = ["the", "a", "der", "la", "le", "batman", "dune", "part", "two", "blade",
+         "runner", "2049", "1917", "alien", "amélie", "fils", "ça", "man", "of", "steel"]
+YEARS = ["1979", "1980", "2017", "2024"]
+
+
+def random_watchlist(rng, size):
+    watchlist = []
+    for _ in range(size):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+        if rng.random() < 0.05:
+            name = rng.choice(["", "!!", "Batman: Part Two", "Dune - Part Two"])
+        watchlist.append((name, rng.choice(YEARS + [""])))
+    return watchlist
+
+
+def random_feed_title(rng, watchlist):
+    if rng.random() < 0.5:
+        name, year = rng.choice(watchlist)
+        words = name.replace(" ", rng.choice([".", " "])).split(".")
+    else:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 5))]
+        year = rng.choice(YEARS)
+    if rng.random() < 0.3:
+        words.insert(rng.randint(0, len(words)), rng.choice(YEARS))
+    if rng.random() < 0.3:
+        words.insert(0, rng.choice(WORDS))
+    return ".".join(words + [year or rng.choice(YEARS), "1080p", "BluRay", "x264-GRP"])
+
+
+def test_index_matches_legacy_title_loop():
+    rng = random.Random(7)
+    cases = 0
+    for _ in range(30):
+        watchlist = random_watchlist(rng, 40)
+        posts = [(random_feed_title(rng, watchlist), f"https://hdencode.org/{i}/") for i in range(100)]
+        index = crawler.WatchlistIndex(watchlist)
+
+        found = [
+            (m["film_name"], m["film_year"], m["link"])
+            for m in crawler.find_matches(index, posts, ())
+        ]
+        assert found == legacy_find_matches(watchlist, posts)
+        cases += len(posts)
+    assert cases == 3000
@@ -0,0 +1,83 @@
+"""Letterboxd-Scrape: jede Seite einmal laden, geladene Seiten vor dem Snapshot."""
+import asyncio
+import contextlib
+from collections import Counter
+
+import watchlist_sync
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+def page_html(*films):
+    return "".join(f'<div data-item-name="{name} ({year})"></div>' for name, year in films)
+
+
+@pytest.fixture
+def letterboxd(monkeypatch, tmp_path):
+    """Serverseitig gerenderte Watchlist: {Seitennummer: HTML}; fehlende Seiten liefern 404."""
+    pages = {}
+    requested = Counter()
+
+    def fake_get(url, **kwargs):
+        requested[url] += 1
+        for num, text in pages.items():
+            if url == watchlist_sync.page_url(num):
+                return FakeResponse(200, text)
+        return FakeResponse(404)
+
+    @contextlib.asynccontextmanager
+    async def no_playwright():
+        yield None  # Der HTTP-Weg braucht keinen Browser
+
+    monkeypatch.setattr(watchlist_sync.requests, "get", fake_get)
+    monkeypatch.setattr(watchlist_sync, "async_playwright", no_playwright)
+    monkeypatch.setattr(watchlist_sync, "SNAPSHOT_FILE", str(tmp_path / "snapshot.json"))
+    return pages, requested
+
+
+def test_http_mode_fetches_first_page_once(letterboxd, monkeypatch):
+    pages, requested = letterboxd
+    pages.update({1: page_html(("Dune", "2021")), 2: page_html(("Alien", "1979"))})
+    monkeypatch.setattr(watchlist_sync, "PARALLEL_PAGES", 2)
+
+    result = asyncio.run(watchlist_sync.scrape_pages(incremental=False))
+
+    assert result == {1: [("Dune", "2021", "")], 2: [("Alien", "1979", "")]}
+    assert requested[watchlist_sync.page_url(1)] == 1
+    assert requested[watchlist_sync.page_url(2)] == 1
+
+
+def test_early_stop_keeps_pages_fetched_in_the_same_batch(letterboxd, monkeypatch):
+    pages, _ = letterboxd
+    monkeypatch.setattr(watchlist_sync, "PARALLEL_PAGES", 4)
+    snapshot = {num: [(f"Alt {num}", "2000", "")] for num in range(1, 7)}
+    watchlist_sync.save_snapshot(snapshot)
+
+    # Seite 1 und 2 unverändert, Seite 3 hat sich geändert
+    pages.update({num: page_html((f"Alt {num}", "2000")) for num in range(1, 7)})
+    pages[3] = page_html(("Neu", "2024"))
+
+    result = asyncio.run(watchlist_sync.scrape_pages(incremental=True))
+
+    assert result[3] == [("Neu", "2024", "")]
+    assert result[5] == snapshot[5] and result[6] == snapshot[6]
+    assert sorted(result) == [1, 2, 3, 4, 5, 6]
+
+
+def test_early_stop_ends_where_the_fetched_watchlist_ends(letterboxd, monkeypatch):
+    pages, _ = letterboxd
+    monkeypatch.setattr(watchlist_sync, "PARALLEL_PAGES", 4)
+    watchlist_sync.save_snapshot({num: [(f"Alt {num}", "2000", "")] for num in range(1, 7)})
+    pages.update({num: page_html((f"Alt {num}", "2000")) for num in range(1, 3)})
+
+    result = asyncio.run(watchlist_sync.scrape_pages(incremental=True))
+
+    assert sorted(result) == [1, 2]
@@ -1,7 +1,13 @@
-import time
+import argparse
+import asyncio
+import json
+import os
 import re
 from datetime import datetime
-from playwright.sync_api import sync_playwright  # type: ignore
+from html import unescape
+import requests  # type: ignore
+from playwright.async_api import async_playwright  # type: ignore
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError  # type: ignore
 import gspread  # type: ignore
 from oauth2client.service_account import (  # type: ignore
     ServiceAccountCredentials,  # type: ignore
@@ -12,6 +18,19 @@ GOOGLE_SHEET_ID = ""
 SHEET_NAME = ""
 CREDENTIALS_FILE = ""
 
+HEADER = ["Hinzugefügt", "Name", "Year"]  # Kopfzeile A1:C1
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_FILE = os.path.join(SCRIPT_DIR, "watchlist_snapshot.json")
+PARALLEL_PAGES = 4  # Gleichzeitig geladene Watchlist-Seiten
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "quantserve.com", "scorecardresearch.com",
+    "facebook.net", "adsafeprotected.com", "pubmatic.com",
+)
+
 
 def connect_sheet():
     scope = [
@@ -26,78 +45,290 @@ def connect_sheet():
     return sheet
 
 
-def scrape_watchlist():
-    print("Scraping Watchlist mit Playwright...")
-    films = []
+def parse_frame_title(raw):
+    """Zerlegt 'Titel (2024)' in (Titel, Jahr)."""
+    raw = raw.strip()
+    match = re.search(r'\((\d{4})\)$', raw)
+    year = match.group(1) if match else ""
+    title = re.sub(r'\s*\(\d{4}\)$', '', raw).strip()
+    return title, year
+
+
+def page_url(page_num):
+    return f"https://letterboxd.com/{LETTERBOXD_USER}/watchlist/page/{page_num}/"
+
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+def load_snapshot():
+    """Lädt die Seiten des letzten Scrapes ({Seitennummer: Filme})."""
+    if not os.path.exists(SNAPSHOT_FILE):
+        return {}
+    try:
+        with open(SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+            pages = json.load(f)
+        return {int(num): [tuple(film) for film in films] for num, films in pages.items()}
+    except Exception as e:
+        print(f"⚠️ Snapshot konnte nicht geladen werden: {e}")
+        return {}
 
-        i = 1
-        while True:
-            print(f"Lade Seite {i}...")
-            url = (
-                f"https://letterboxd.com/{LETTERBOXD_USER}/watchlist/page/{i}/"
+
+def save_snapshot(pages):
+    tmp_path = SNAPSHOT_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({str(num): films for num, films in pages.items()}, f, ensure_ascii=False)
+    os.replace(tmp_path, SNAPSHOT_FILE)
+
+
+def fetch_page_http(page_num):
+    """
+    Schneller Weg ohne Browser: liest die Filme aus dem serverseitig
+    gerenderten HTML. Liefert None, wenn die Seite nur per JavaScript
+    vollständig wird.
+    """
+    response = requests.get(page_url(page_num), headers=HTTP_HEADERS, timeout=30)
+    if response.status_code == 404:
+        return []
+    response.raise_for_status()
+    html = response.text
+
+    names = re.findall(r'data-item-name="([^"]+)"', html)
+    if names:
+        return [parse_frame_title(unescape(name)) + ("",) for name in names]
+
+    films = re.findall(
+        r'data-film-name="([^"]+)"[^>]*?data-film-release-year="(\d{4})?"', html
+    )
+    if films:
+        return [(unescape(title).strip(), year, "") for title, year in films]
+
+    if "poster-container" in html or "griditem" in html:
+        return None  # Poster vorhanden, Titel aber nur per JavaScript
+    return []
+
+
+async def block_resources(route):
+    """Bilder, Schriften und Tracker gar nicht erst laden."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        host in request.url for host in BLOCKED_HOSTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def fetch_page_browser(browser, page_num):
+    """Lädt eine Seite in einem eigenen Browser-Kontext und liest die Filmtitel."""
+    context = await browser.new_context()
+    try:
+        await context.route("**/*", block_resources)
+        page = await context.new_page()
+        await page.goto(page_url(page_num), timeout=60000, wait_until="domcontentloaded")
+
+        try:
+            await page.wait_for_selector(".frame-title", state="attached", timeout=15000)
+        except PlaywrightTimeoutError:
+            return []  # Keine Filme mehr auf dieser Seite
+
+        # Nachgeladene Poster: bis alle Titel da sind statt fester Pausen
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            await page.wait_for_function(
+                "document.querySelectorAll('.frame-title').length >= "
+                "document.querySelectorAll('li.poster-container, li.griditem').length",
+                timeout=10000,
             )
-            page.goto(url, timeout=60000)
+        except PlaywrightTimeoutError:
+            pass
+
+        elements = await page.query_selector_all(".frame-title")
+        return [parse_frame_title(await el.inner_text()) + ("",) for el in elements]
+    finally:
+        await context.close()
+
+
+async def scrape_pages(incremental):
+    snapshot = load_snapshot() if incremental else {}
+    loop = asyncio.get_running_loop()
 
-            previous_height = 0
+    # Seite 1 entscheidet über den Modus und wird danach nicht erneut geladen
+    prefetched = {}
+    try:
+        prefetched[1] = await loop.run_in_executor(None, fetch_page_http, 1)
+        use_http = prefetched[1] is not None
+    except Exception as e:
+        print(f"⚠️ HTTP-Abruf fehlgeschlagen, nutze Browser: {e}")
+        use_http = False
+    print("→ Modus: " + ("HTTP (serverseitig gerendert)" if use_http else "Playwright"))
+
+    async with async_playwright() as p:
+        browser = None
+        semaphore = asyncio.Semaphore(PARALLEL_PAGES)
+
+        async def fetch(num):
+            nonlocal browser
+            async with semaphore:
+                print(f"Lade Seite {num}...")
+                if use_http:
+                    if num in prefetched:
+                        return prefetched.pop(num)
+                    return await loop.run_in_executor(None, fetch_page_http, num)
+                if browser is None:
+                    browser = await p.chromium.launch(headless=True)
+                return await fetch_page_browser(browser, num)
+
+        pages = {}
+        page_num = 1
+        try:
             while True:
-                current_height = page.evaluate("document.body.scrollHeight")
-                if current_height == previous_height:
-                    break
-                previous_height = current_height
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(1.0)
+                batch = list(range(page_num, page_num + PARALLEL_PAGES))
+                results = await asyncio.gather(*(fetch(num) for num in batch))
+                if any(result is None for result in results):
+                    # Nicht serverseitig gerendert: Batch im Browser wiederholen
+                    use_http = False
+                    continue
 
-            elements = page.query_selector_all(".frame-title")
-            if not elements:
-                print("⚠️ Keine weiteren Filme gefunden – Abbruch.")
-                break
+                for num, films in zip(batch, results):
+                    if not films:
+                        print("⚠️ Keine weiteren Filme gefunden – Abbruch.")
+                        return pages
 
-            for el in elements:
-                raw = el.inner_text().strip()
-                match = re.search(r'\((\d{4})\)$', raw)
-                year = match.group(1) if match else ""
-                title = re.sub(r'\s*\(\d{4}\)$', '', raw).strip()
+                    pages[num] = films
+                    for title, year, _ in films:
+                        print(f"→ Gefunden: {title} ({year})")
 
-                films.append((title, year, ""))
-                print(f"→ Gefunden: {title} ({year})")
+                    if snapshot.get(num) == films:
+                        print(f"✓ Seite {num} unverändert – übernehme restliche Seiten aus dem Snapshot.")
+                        # Im selben Batch bereits geladene Seiten haben Vorrang vor dem Snapshot
+                        for later_num, later_films in zip(batch, results):
+                            if later_num <= num:
+                                continue
+                            if not later_films:
+                                return pages  # Watchlist endet vor dem Snapshot
+                            pages[later_num] = later_films
+                        for old_num in sorted(snapshot):
+                            if old_num > batch[-1]:
+                                pages[old_num] = snapshot[old_num]
+                        return pages
 
-            i += 1
-            time.sleep(1.5)
+                page_num += PARALLEL_PAGES
+        finally:
+            if browser is not None:
+                await browser.close()
 
-        browser.close()
 
+def scrape_watchlist(incremental=True):
+    """
+    Lädt die Watchlist seitenweise, jeweils PARALLEL_PAGES Seiten
+    gleichzeitig. Im inkrementellen Modus endet der Scrape an der ersten
+    Seite, die unverändert im letzten Snapshot steht; bereits geladene
+    Seiten desselben Batches werden übernommen, nur die übrigen Seiten
+    stammen aus dem Snapshot.
+    """
+    print("Scraping Watchlist...")
+    pages = asyncio.run(scrape_pages(incremental))
+
+    save_snapshot(pages)
+    films = [film for num in sorted(pages) for film in pages[num]]
     print(f"✓ Insgesamt {len(films)} Filme gesammelt.")
     return films
 
 
+def film_key(title, year):
+    """Vergleichsschlüssel für einen Film: normalisierter Titel und Jahr."""
+    return re.sub(r"\s+", " ", str(title).strip().lower()), str(year).strip()
+
+
+def pad_row(row, width=4):
+    return [str(cell) for cell in row][:width] + [""] * (width - len(row))
+
+
+def plan_sheet_changes(rows, watchlist, today):
+    """
+    Berechnet die Zielzeilen (ab Zeile 2) für die neue Watchlist.
+
+    Unveränderte Filme bleiben mit ihrem Hinzugefügt-Datum an ihrer Stelle,
+    neue Filme füllen zuerst die Lücken entfernter Filme, übrige Lücken
+    werden mit Zeilen vom Tabellenende geschlossen. Liefert (Zielzeilen,
+    Anzahl neu, Anzahl entfernt).
+    """
+    wanted = {}
+    for title, year, uri in watchlist:
+        wanted.setdefault(film_key(title, year), pad_row([today, title, year, uri]))
+
+    target = []
+    present = set()
+    for row in rows:
+        row = pad_row(row)
+        key = film_key(row[1], row[2])
+        if row[1].strip() and key in wanted and key not in present:
+            target.append(row)
+            present.add(key)
+        else:
+            target.append(None)  # Entfernt, doppelt oder leer
+
+    added = [row for key, row in wanted.items() if key not in present]
+    removed = sum(1 for row, old in zip(target, rows) if row is None and "".join(old).strip())
+    new_rows = list(added)
+
+    for i, row in enumerate(target):
+        if row is None and new_rows:
+            target[i] = new_rows.pop(0)
+
+    # Verbleibende Lücken mit Zeilen vom Ende schließen
+    while True:
+        while target and target[-1] is None:
+            target.pop()
+        if None not in target:
+            break
+        target[target.index(None)] = target.pop()
+
+    return target + new_rows, len(added), removed
+
+
 def sync_sheet(watchlist):
+    """
+    Gleicht das Google Sheet mit der Watchlist ab: liest das Sheet einmal,
+    berechnet neue und entfernte Filme und schreibt nur die geänderten
+    Zeilen in einem einzigen batch_update, sodass das Sheet nie leer oder
+    halb geschrieben gelesen werden kann.
+    """
     print("Synchronisiere mit Google Sheet...")
-    sheet = connect_sheet()
-
-    # Erst alle Inhalte ab Zeile 2 löschen
-    sheet.batch_clear(['A2:D'])
+    if not watchlist:
+        print("Keine Filme zum Synchronisieren gefunden – Sheet bleibt unverändert.")
+        return
 
-    # Spaltenüberschriften in Zeile 1 setzen
-    sheet.update('A1:D1', [['Hinzugefügt', 'Name', 'Year']])
+    sheet = connect_sheet()
+    values = sheet.get_all_values()
+    header = values[0] if values else []
+    rows = values[1:]
 
     # Aktuelles Datum (nur Datum, nicht Uhrzeit)
     today = datetime.now().strftime("%Y-%m-%d")
+    target, added, removed = plan_sheet_changes(rows, watchlist, today)
 
-    # Zeilen vorbereiten
-    rows = [[today, title, year, uri] for (title, year, uri) in watchlist]
+    updates = []
+    if pad_row(header, 3) != HEADER:
+        updates.append({"range": "A1:C1", "values": [HEADER]})
 
-    if rows:
-        # Alle Filmdaten auf einmal schreiben (ab Zeile 2)
-        sheet.update(f'A2:D{len(rows)+1}', rows)
-        print(f"✓ {len(rows)} Filme synchronisiert.")
-    else:
-        print("Keine Filme zum Synchronisieren gefunden.")
+    for i in range(max(len(target), len(rows))):
+        new_row = target[i] if i < len(target) else [""] * 4
+        old_row = pad_row(rows[i]) if i < len(rows) else None
+        if new_row != old_row:
+            updates.append({"range": f"A{i + 2}:D{i + 2}", "values": [new_row]})
+
+    if not updates:
+        print(f"✓ Keine Änderungen ({len(target)} Filme).")
+        return
+
+    sheet.batch_update(updates)
+    print(f"✓ {len(target)} Filme synchronisiert ({added} neu, {removed} entfernt).")
 
 
 if __name__ == "__main__":
-    watchlist = scrape_watchlist()
+    parser = argparse.ArgumentParser(description="Letterboxd-Watchlist → Google Sheet")
+    parser.add_argument("--full", action="store_true",
+                        help="Alle Seiten neu laden statt am letzten Snapshot abzubrechen")
+    args = parser.parse_args()
+
+    watchlist = scrape_watchlist(incremental=not args.full)
     sync_sheet(watchlist)